@@ -28,8 +28,6 @@ THE SOFTWARE.
 """
 
 import cgi
-import cPickle as pickle
-import gzip
 import locale
 import os
 from robotparser import RobotFileParser
@@ -37,7 +35,6 @@ import sys
 import tempfile
 import time
 from urlparse import urlsplit
-import zlib
 
 assert sys.version_info[0] == 2 and sys.version_info[1] >= 6, \
     "Please use Python 2.6 or greater"
@@ -45,8 +42,13 @@ assert sys.version_info[0] == 2 and sys.version_info[1] >= 6, \
 import thor
 from redbot import __version__
 from redbot.cache_file import CacheFile
+from redbot import saved
+from redbot.store import Store, Sweeper, Writer
+from redbot.check_pool import CheckPool
+from redbot.render_cache import RenderCache, gunzip_bytes, etag_matches, \
+    accepts_gzip
 from redbot.resource import HttpResource, RedFetcher, UA_STRING
-from redbot.formatter import *
+from redbot.static_files import StaticFiles
 from redbot.formatter import find_formatter, html
 
 ### Configuration ##########################################################
@@ -68,6 +70,28 @@ save_dir = '/var/state/redbot/'
 # how long to store things when users save them, in days.
 save_days = 30
 
+# the most saved tests (files and bytes) to keep in save_dir; when there are
+# more, the oldest are removed by the standalone server. None for no limit.
+save_max_files = None
+save_max_bytes = None
+
+# how many rendered saved tests to keep in memory.
+render_cache_size = 64
+
+# how many tests can be waiting to be written to save_dir; when there are
+# more, new tests can't be saved.
+save_queue_size = 32
+
+# how many checks the standalone server runs at once, each in its own
+# process; more wait. 0 to run them in the server process.
+check_jobs = 8
+
+# limits for each check process: seconds of CPU, bytes of memory, and
+# seconds before it's killed.
+check_cpu_limit = max_runtime
+check_mem_limit = 512 * 1024 * 1024
+check_timeout = max_runtime + 30
+
 # URI root for static assets (absolute or relative, but no trailing '/')
 html.static_root = 'static'
 
@@ -84,6 +108,16 @@ RedFetcher.robot_cache_dir = "/var/state/robots-txt/" if not debug else False
 
 ### End configuration ######################################################
 
+render_cache = RenderCache(render_cache_size)
+_save_writer = None
+
+def save_writer():
+    "Return the Writer for save_dir."
+    global _save_writer
+    if _save_writer is None:
+        _save_writer = Writer(Store(save_dir), save_queue_size)
+    return _save_writer
+
 
 # HTML template for error bodies
 error_template = u"""\
@@ -105,11 +139,15 @@ class RedWebUi(object):
 
     Given a URI, run RED on it and present the results to output as HTML.
     If descend is true, spider the links and present a summary.
+
+    client_hdrs are the headers of the request made to the Web UI, as a
+    list of (name, value) tuples.
     """
     def __init__(self, base_uri, method, query_string,
-      response_start, response_body, response_done):
+      response_start, response_body, response_done, client_hdrs=None):
         self.base_uri = base_uri
         self.method = method
+        self.client_hdrs = client_hdrs or []
         self.response_start = response_start
         self.response_body = response_body
         self._response_done = response_done
@@ -150,13 +188,7 @@ class RedWebUi(object):
         """Save a previously run test_id."""
         try:
             # touch the save file so it isn't deleted.
-            os.utime(
-                os.path.join(save_dir, self.test_id),
-                (
-                    thor.time(),
-                    thor.time() + (save_days * 24 * 60 * 60)
-                )
-            )
+            Store(save_dir).keep(self.test_id, save_days * 24 * 60 * 60)
             location = "?id=%s" % self.test_id
             if self.descend:
                 location = "%s&descend=True" % location
@@ -179,11 +211,11 @@ class RedWebUi(object):
     def load_saved_test(self):
         """Load a saved test by test_id."""
         try:
-            fd = gzip.open(os.path.join(
-                save_dir, os.path.basename(self.test_id)
-            ))
+            store = Store(save_dir)
+            fd = store.open(self.test_id)
             mtime = os.fstat(fd.fileno()).st_mtime
-        except (OSError, IOError, TypeError, zlib.error):
+            pending = store.pending(fd)
+        except (OSError, IOError, TypeError):
             self.response_start(
                 "404", "Not Found", [
                 ("Content-Type", "text/html; charset=%s" % charset),
@@ -195,50 +227,118 @@ class RedWebUi(object):
             )
             self.response_done([])
             return
-        is_saved = mtime > thor.time()
-        try:
-            state = pickle.load(fd)
-        except (pickle.PickleError, IOError, EOFError):
+        if pending:
+            # the test hasn't been written yet; see Store.Writer
+            fd.close()
             self.response_start(
-                "500", "Internal Server Error", [
+                "503", "Service Unavailable", [
                 ("Content-Type", "text/html; charset=%s" % charset),
-                ("Cache-Control", "max-age=600, must-revalidate")
+                ("Cache-Control", "no-store"),
+                ("Retry-After", "1"),
             ])
-            # TODO: better error page (through formatter?)
             self.response_body(error_template %
-                "I'm sorry, I had a problem reading that response."
+                "That test is still being written; please try again."
             )
             self.response_done([])
             return
+        is_saved = mtime > thor.time()
+        try:
+            try:
+                saved_test = saved.SavedTest(fd)
+                state = None
+                if self.check_type:
+                    state = saved_test.subreq(self.check_type)
+                if state is None:
+                    check_type = None
+                    state = saved_test.resource()
+                else:
+                    check_type = self.check_type
+            except (saved.SaveError, IOError):
+                self.response_start(
+                    "500", "Internal Server Error", [
+                    ("Content-Type", "text/html; charset=%s" % charset),
+                    ("Cache-Control", "max-age=600, must-revalidate")
+                ])
+                # TODO: better error page (through formatter?)
+                self.response_body(error_template %
+                    "I'm sorry, I had a problem reading that response."
+                )
+                self.response_done([])
+                return
+            formatter_class = find_formatter(self.format, 'html', self.descend)
+            # only use resolved values, so that clients can't make new
+            # variants at will
+            variant = (formatter_class.name, check_type, bool(self.descend),
+                       is_saved)
+            page = render_cache.get(self.test_id, fd.name, variant)
+            if page is None:
+                body = self.render_saved_test(
+                    saved_test, state, formatter_class, is_saved)
+                page = render_cache.put(self.test_id, fd.name, variant, body)
         finally:
             fd.close()
+        self.send_page(page, formatter_class.media_type)
 
-        formatter = find_formatter(self.format, 'html', self.descend)(
-            self.base_uri, state.request.uri, state.orig_req_hdrs, lang,
-            self.output, allow_save=(not is_saved), is_saved=True,
-            test_id=self.test_id
+    def render_saved_test(self, saved_test, state, formatter_class, is_saved):
+        """
+        Render state (the main resource or a subrequest of saved_test),
+        returning the bytes.
+        """
+        out = []
+        resource = saved_test.resource()
+        formatter = formatter_class(
+            self.base_uri, resource.request.uri, resource.orig_req_hdrs, lang,
+            lambda chunk: out.append(chunk.encode(charset, 'replace')),
+            allow_save=(not is_saved), is_saved=True, test_id=self.test_id
         )
-        self.response_start(
-            "200", "OK", [
-            ("Content-Type", "%s; charset=%s" % (
-                formatter.media_type, charset)),
-            ("Cache-Control", "max-age=3600, must-revalidate")
-        ])
-        if self.check_type:
-        # TODO: catch errors
-            state = state.subreqs.get(self.check_type, None)
-
+        # subrequests and linked resources are read as they're formatted
         formatter.start_output()
         formatter.set_state(state)
         formatter.finish_output()
+        return "".join(out)
+
+    def send_page(self, page, media_type):
+        """
+        Send a rendered page, (etag, gzipped body), or a 304 if the client
+        already has it.
+        """
+        etag, gz_body = page
+        hdrs = [
+            ("Cache-Control", "max-age=3600, must-revalidate"),
+            ("ETag", etag),
+            ("Vary", "Accept-Encoding"),
+        ]
+        if etag_matches(self.client_hdr('if-none-match'), etag):
+            self.response_start("304", "Not Modified", hdrs)
+            self.response_done([])
+            return
+        hdrs.append(
+            ("Content-Type", "%s; charset=%s" % (media_type, charset))
+        )
+        if accepts_gzip(self.client_hdr('accept-encoding')):
+            hdrs.append(("Content-Encoding", "gzip"))
+            body = gz_body
+        else:
+            body = gunzip_bytes(gz_body)
+        hdrs.append(("Content-Length", str(len(body))))
+        self.response_start("200", "OK", hdrs)
+        self.response_body(body)
         self.response_done([])
 
+    def client_hdr(self, name):
+        "Return the value of the named client request header, or None."
+        values = [v for (n, v) in self.client_hdrs if n.lower() == name]
+        if not values:
+            return None
+        return ", ".join(values)
+
     def run_test(self):
         """Test a URI."""
-        if save_dir and os.path.exists(save_dir):
+        if save_dir and os.path.exists(save_dir) and \
+          not save_writer().busy():
             try:
-                fd, path = tempfile.mkstemp(prefix='', dir=save_dir)
-                test_id = os.path.split(path)[1]
+                fd, test_id = Store(save_dir).new()
+                os.close(fd)
             except (OSError, IOError):
                 # Don't try to store it.
                 test_id = None
@@ -300,6 +400,8 @@ class RedWebUi(object):
         )
 #        sys.stdout.write(pickle.dumps(ired))
         formatter.start_output()
+        if not self.check_type:
+            formatter.bind_resource(ired)
 
         def done():
             if self.check_type:
@@ -311,12 +413,11 @@ class RedWebUi(object):
             formatter.finish_output()
             self.response_done([])
             if test_id:
-                try:
-                    tmp_file = gzip.open(path, 'w')
-                    pickle.dump(ired, tmp_file)
-                    tmp_file.close()
-                except (IOError, zlib.error, pickle.PickleError):
-                    pass # we don't cry if we can't store it.
+                # only take a snapshot here; it's written in the background.
+                # We don't cry if we can't store it.
+                save_writer().submit(
+                    test_id, saved.write, saved.snapshot(ired)
+                )
 #            objgraph.show_growth()
         ired.run(done)
 
@@ -519,7 +620,8 @@ def mod_python_handler(r):
     query_string = cgi.parse_qs(r.args or "")
     try:
         RedWebUi(r.unparsed_uri, r.method, query_string,
-                 response_start, r.write, response_done)
+                 response_start, r.write, response_done,
+                 r.headers_in.items())
         thor.run()
     except:
         except_handler_factory(r.write)()
@@ -537,6 +639,8 @@ def cgi_main():
     )
     method = os.environ.get('REQUEST_METHOD')
     query_string = cgi.parse_qs(os.environ.get('QUERY_STRING', ""))
+    client_hdrs = [(k[5:].replace("_", "-"), v)
+                   for (k, v) in os.environ.items() if k[:5] == "HTTP_"]
 
     def response_start(code, phrase, res_hdrs):
         sys.stdout.write("Status: %s %s\n" % (code, phrase))
@@ -548,46 +652,65 @@ def cgi_main():
         thor.schedule(0, thor.stop)
     try:
         RedWebUi(base_uri, method, query_string,
-                 response_start, sys.stdout.write, response_done)
+                 response_start, sys.stdout.write, response_done,
+                 client_hdrs)
         thor.run()
+        if _save_writer:
+            _save_writer.close() # don't exit before the test is saved
     except:
         except_handler_factory(sys.stdout.write)()
 
 
-def standalone_main(host, port, static_dir):
-    """Run RED as a standalone Web server."""
+def standalone_main(host, port, static_dir, workers=0):
+    """
+    Run RED as a standalone Web server. If workers is non-zero, pre-fork
+    that many worker processes; see redbot.prefork.
+    """
 
     # load static files
-    static_files = {}
-    def static_walker(arg, dirname, names):
-        for name in names:
-            try:
-                path = os.path.join(dirname, name)
-                if os.path.isdir(path):
-                    continue
-                uri = os.path.relpath(path, static_dir)
-                static_files["/static/%s" % uri] = open(path).read()
-            except IOError:
-                sys.stderr.write(
-                  "* Problem loading %s\n" % path
-                )
-    os.path.walk(static_dir, static_walker, "")
+    static_files = StaticFiles()
+    static_files.load(static_dir)
+    html.static_versions = static_files.versions()
+
+    check_pool = None
+    if check_jobs:
+        def close_save_writer():
+            if _save_writer:
+                _save_writer.close()
+        check_pool = CheckPool(
+            check_jobs, cpu_limit=check_cpu_limit, mem_limit=check_mem_limit,
+            timeout=check_timeout, on_exit=close_save_writer
+        )
 
     def red_handler(x):
         @thor.events.on(x)
         def request_start(method, uri, req_hdrs):
             p_uri = urlsplit(uri)
-            if static_files.has_key(p_uri.path):
-                x.response_start("200", "OK", []) # TODO: headers
-                x.response_body(static_files[p_uri.path])
+            static = static_files.respond(p_uri.path, p_uri.query, req_hdrs)
+            if static:
+                code, phrase, hdrs, body = static
+                x.response_start(code, phrase, hdrs)
+                if method != "HEAD":
+                    x.response_body(body)
                 x.response_done([])
             elif p_uri.path == "/":
                 query_string = cgi.parse_qs(p_uri.query)
+                if check_pool and query_string.has_key('uri') and \
+                  not query_string.has_key('id'):
+                    # run the check in its own process
+                    def check(response_start, response_body, response_done):
+                        RedWebUi('/', method, query_string,
+                                 response_start, response_body, response_done,
+                                 req_hdrs)
+                    check_pool.run(check, x.response_start,
+                                   x.response_body, x.response_done)
+                    return
                 try:
                     RedWebUi('/', method, query_string,
                              x.response_start,
                              x.response_body,
-                             x.response_done
+                             x.response_done,
+                             req_hdrs
                             )
                 except RuntimeError:
                     raise
@@ -606,8 +729,25 @@ in standalone server mode. Details follow.
                 x.response_start("404", "Not Found", [])
                 x.response_done([])
 
+    def start_sweeper():
+        if save_dir and os.path.exists(save_dir):
+            Sweeper(Store(save_dir), save_max_files, save_max_bytes).start()
+
+    if workers:
+        from redbot import prefork
+        def run_worker(sock, index):
+            if index == 0: # only one worker needs to sweep
+                start_sweeper()
+            prefork.serve(sock, red_handler)
+        prefork.warm_up()
+        sock = thor.tcp.server_listen(host, port)
+        prefork.Supervisor(sock, workers, run_worker).run()
+        sys.stderr.write("Stopped.\n")
+        return
+
     server = thor.http.HttpServer(host, port)
     server.on('exchange', red_handler)
+    start_sweeper()
 
     try:
         thor.run()
@@ -616,16 +756,7 @@ in standalone server mode. Details follow.
         thor.stop()
     # TODO: logging
     # TODO: extra resources
-
-def standalone_monitor (host, port, static_dir):
-    """Fork a process as a standalone Web server and watch it."""
-    from multiprocessing import Process
-    while True:
-        p = Process(target=standalone_main, args=(host, port, static_dir))
-        sys.stderr.write("* Starting RED server...\n")
-        p.start()
-        p.join()
-        # TODO: listen to socket and drop privs
+    # TODO: listen to socket and drop privs
 
 
 if __name__ == "__main__":
@@ -637,6 +768,12 @@ if __name__ == "__main__":
         usage = "Usage: %prog [options] port static_dir"
         version = "RED version %s" % __version__
         option_parser = OptionParser(usage=usage, version=version)
+        option_parser.set_defaults(workers=0)
+        option_parser.add_option(
+            "-w", "--workers",
+            action="store", type="int", dest="workers",
+            help="pre-fork this many worker processes (default: none)"
+        )
         (options, args) = option_parser.parse_args()
         if len(args) < 2:
             option_parser.error(
@@ -649,6 +786,9 @@ if __name__ == "__main__":
                 "Port is not an integer."
             )
 
+        if options.workers < 0:
+            option_parser.error("Workers can't be negative.")
+
         static_dir = args[1]
         sys.stderr.write(
             "Starting standalone server on PID %s...\n" % os.getpid() + \
@@ -657,5 +797,4 @@ if __name__ == "__main__":
 
 #       import pdb
 #       pdb.run('standalone_main("", port, static_dir)')
-        standalone_main("", port, static_dir)
-#       standalone_monitor("", port, static_dir)
+        standalone_main("", port, static_dir, options.workers)
@@ -0,0 +1,310 @@
+#!/usr/bin/env python
+
+"""
+A pool of processes to run checks in.
+
+Each check (job) is run in its own forked process, with limits on the CPU
+time and memory it can use, and killed if it takes longer than a wall-clock
+timeout. The job's response is streamed back to the process that forked
+it over a pipe, so that a check that misbehaves (or a target that makes it
+misbehave) only costs its own process, and the server stays responsive.
+
+Only so many jobs run at once; others wait in a queue, and when that's
+full, they're refused with a 503.
+"""
+
+from __future__ import absolute_import # for the resource module
+
+__author__ = "Mark Nottingham <mnot@mnot.net>"
+__copyright__ = """\
+Copyright (c) 2008-2013 Mark Nottingham
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+"""
+
+from collections import deque
+import errno
+import fcntl
+import json
+import os
+import struct
+import sys
+import traceback
+import unittest
+
+import thor
+import thor.loop
+from thor.loop import EventSource
+
+from redbot.prefork import reset_loop
+
+### configuration
+MAX_JOBS = 8 # jobs to run at once
+QUEUE_SIZE = 32 # jobs that can wait to run
+CPU_LIMIT = 60 # seconds of CPU a job can use
+MEM_LIMIT = 512 * 1024 * 1024 # bytes of memory a job can use
+TIMEOUT = 90 # seconds a job can take before it's killed
+
+FRAME_HEADER = struct.Struct("!cI") # kind, length
+READ_SIZE = 64 * 1024
+
+
+class CheckPool(object):
+    """
+    Run jobs in child processes. A job is a callable that's given
+    response_start, response_body and response_done functions, and runs
+    on the child's thor loop until it calls response_done.
+
+    If given, on_exit is called in the child after its loop stops.
+    """
+    def __init__(self, max_jobs=MAX_JOBS, queue_size=QUEUE_SIZE,
+                 cpu_limit=CPU_LIMIT, mem_limit=MEM_LIMIT, timeout=TIMEOUT,
+                 on_exit=None):
+        self.max_jobs = max_jobs
+        self.queue_size = queue_size
+        self.cpu_limit = cpu_limit
+        self.mem_limit = mem_limit
+        self.timeout = timeout
+        self.on_exit = on_exit
+        self.running = 0
+        self.stats = {'run': 0, 'refused': 0, 'killed': 0, 'failed': 0}
+        self._queue = deque()
+
+    def run(self, job, response_start, response_body, response_done):
+        "Run job, sending its response to the given functions."
+        if self.running < self.max_jobs:
+            self._start(job, response_start, response_body, response_done)
+        elif len(self._queue) < self.queue_size:
+            self._queue.append(
+                (job, response_start, response_body, response_done)
+            )
+        else:
+            self.stats['refused'] += 1
+            response_start("503", "Service Unavailable", [
+                ("Content-Type", "text/plain"),
+                ("Retry-After", "10"),
+            ])
+            response_body("Too many checks are running; try again soon.")
+            response_done([])
+
+    def _start(self, job, response_start, response_body, response_done):
+        rfd, wfd = os.pipe()
+        pid = os.fork()
+        if pid == 0:
+            os.close(rfd)
+            self._child(job, wfd)
+        os.close(wfd)
+        self.running += 1
+        self.stats['run'] += 1
+        JobReader(self, pid, rfd, response_start, response_body,
+                  response_done)
+
+    def _job_done(self, reader):
+        "Called by a JobReader when its job is finished."
+        self.running -= 1
+        if reader.killed:
+            self.stats['killed'] += 1
+        elif reader.failed:
+            self.stats['failed'] += 1
+        while self._queue and self.running < self.max_jobs:
+            self._start(*self._queue.popleft())
+
+    def _child(self, job, wfd):
+        "Run job in this (forked) process, writing its response to wfd."
+        status = 0
+        try:
+            # don't hold on to the parent's sockets, or watch them.
+            for fd in thor.loop._loop._fd_targets.keys():
+                try:
+                    os.close(fd)
+                except OSError:
+                    pass
+            reset_loop()
+            self._set_limits()
+            def send(kind, payload):
+                data = FRAME_HEADER.pack(kind, len(payload)) + payload
+                while data:
+                    data = data[os.write(wfd, data):]
+            def response_start(code, phrase, res_hdrs):
+                send('s', json.dumps([code, phrase, res_hdrs]))
+            def response_body(chunk):
+                if chunk:
+                    send('b', chunk)
+            def response_done(trailers):
+                send('d', json.dumps(trailers))
+                thor.schedule(0, thor.stop)
+            job(response_start, response_body, response_done)
+            thor.run()
+            if self.on_exit:
+                self.on_exit()
+        except:
+            traceback.print_exc()
+            status = 1
+        os._exit(status)
+
+    def _set_limits(self):
+        import resource # not redbot.resource
+        if self.cpu_limit:
+            resource.setrlimit(resource.RLIMIT_CPU,
+                               (self.cpu_limit, self.cpu_limit + 5))
+        if self.mem_limit:
+            resource.setrlimit(resource.RLIMIT_AS,
+                               (self.mem_limit, self.mem_limit))
+
+
+class JobReader(EventSource):
+    """
+    Read a job's response from the pipe rfd, passing it on, and kill the
+    job if it takes too long.
+    """
+    def __init__(self, pool, pid, rfd, response_start, response_body,
+                 response_done):
+        EventSource.__init__(self)
+        self.pool = pool
+        self.pid = pid
+        self.rfd = rfd
+        self.response_start = response_start
+        self.response_body = response_body
+        self.response_done = response_done
+        self.started = False
+        self.finished = False
+        self.killed = False
+        self.failed = False
+        self._buffer = ""
+        fcntl.fcntl(rfd, fcntl.F_SETFL,
+                    fcntl.fcntl(rfd, fcntl.F_GETFL) | os.O_NONBLOCK)
+        self.on('readable', self.handle_read)
+        self.on('close', self.handle_read)
+        self.register_fd(rfd, 'readable')
+        self._timeout = thor.schedule(pool.timeout, self.kill)
+
+    def handle_read(self):
+        try:
+            data = os.read(self.rfd, READ_SIZE)
+        except OSError, why:
+            if why.errno in [errno.EAGAIN, errno.EINTR]:
+                return
+            data = ""
+        if not data:
+            self.close()
+            return
+        self._buffer += data
+        while len(self._buffer) >= FRAME_HEADER.size:
+            kind, length = FRAME_HEADER.unpack_from(self._buffer)
+            end = FRAME_HEADER.size + length
+            if len(self._buffer) < end:
+                break
+            payload = self._buffer[FRAME_HEADER.size:end]
+            self._buffer = self._buffer[end:]
+            self.handle_frame(kind, payload)
+
+    def handle_frame(self, kind, payload):
+        if self.finished:
+            return
+        if kind == 's':
+            code, phrase, res_hdrs = json.loads(payload)
+            self.started = True
+            self.response_start(
+                code.encode('ascii'), phrase.encode('ascii'),
+                [(k.encode('ascii'), v.encode('utf-8')) for (k, v) in res_hdrs]
+            )
+        elif kind == 'b':
+            self.response_body(payload)
+        elif kind == 'd':
+            self.finished = True
+            self.response_done(json.loads(payload))
+
+    def kill(self):
+        "The job has taken too long."
+        self.killed = True
+        try:
+            os.kill(self.pid, 9)
+        except OSError:
+            pass
+        self.close()
+
+    def close(self):
+        "The job is finished, one way or another."
+        if self.rfd is None:
+            return
+        self._timeout.delete()
+        self.unregister_fd()
+        os.close(self.rfd)
+        self.rfd = None
+        if not self.finished:
+            self.failed = True
+            self.finished = True
+            if not self.started:
+                self.response_start("500", "Internal Server Error", [
+                    ("Content-Type", "text/plain"),
+                ])
+                self.response_body("Sorry, that check failed.")
+            self.response_done([])
+        self._reap()
+        self.pool._job_done(self)
+
+    def _reap(self):
+        "Collect the child's exit status, when it's available."
+        try:
+            pid, status = os.waitpid(self.pid, os.WNOHANG)
+        except OSError:
+            return
+        if pid == 0: # not yet
+            thor.schedule(0.5, self._reap)
+
+
+class CheckPoolTest(unittest.TestCase):
+    def run_jobs(self, pool, jobs):
+        results = []
+        def run(job):
+            result = {'body': []}
+            results.append(result)
+            def start(code, phrase, hdrs):
+                result['status'] = code
+            def done(trailers):
+                result['done'] = True
+                if len([r for r in results if r.get('done')]) == len(jobs):
+                    thor.stop()
+            pool.run(job, start, result['body'].append, done)
+        for job in jobs:
+            run(job)
+        thor.schedule(10, thor.stop)
+        thor.run()
+        return results
+
+    def test_jobs(self):
+        def good(start, body, done):
+            start("200", "OK", [])
+            body("pid %s" % os.getpid())
+            done([])
+        def bad(start, body, done):
+            os._exit(1)
+        def slow(start, body, done):
+            start("200", "OK", [])
+            thor.schedule(5, done, [])
+        # the test loader makes redbot.resource importable as resource
+        pool = CheckPool(max_jobs=2, queue_size=1, timeout=1,
+                         cpu_limit=None, mem_limit=None)
+        results = self.run_jobs(pool, [good, bad, slow, good])
+        self.assertEqual([r['status'] for r in results],
+                         ["200", "500", "200", "503"])
+        self.assertNotEqual(results[0]['body'], ["pid %s" % os.getpid()])
+        self.assertEqual(pool.stats,
+                         {'run': 3, 'refused': 1, 'killed': 1, 'failed': 1})
+        self.assertEqual(pool.running, 0)
@@ -2,6 +2,11 @@
 
 """
 Formatters for RED output.
+
+Formatter modules are only imported when one of their formats is asked for;
+see FORMATTER_MODULES. Other packages can add formats with an entry point in
+the ENTRY_POINT_GROUP group, named for the format, that refers to the module
+defining it.
 """
 
 __author__ = "Mark Nottingham <mnot@mnot.net>"
@@ -32,9 +37,21 @@ import locale
 import time
 import unittest
 
-__all__ = ['html', 'text', 'har']
+__all__ = ['html', 'text', 'har', 'jsonl']
+
+# format name: module that defines its formatters
+FORMATTER_MODULES = {
+    'html': 'redbot.formatter.html',
+    'txt': 'redbot.formatter.text',
+    'txt_verbose': 'redbot.formatter.text',
+    'har': 'redbot.formatter.har',
+    'har_compact': 'redbot.formatter.har',
+    'jsonl': 'redbot.formatter.jsonl',
+}
+ENTRY_POINT_GROUP = 'redbot.formatters'
 
 _formatters = defaultdict(list)
+_plugins = None # format name: entry point, once found; see _entry_points
 
 class FormatterType(type):
     """
@@ -47,16 +64,44 @@ class FormatterType(type):
             _formatters[attrs['name']].append(cls)
         return cls
 
+def _entry_points():
+    """
+    Return a dictionary of format names to entry points for formatters in
+    other packages. setuptools is only needed (and imported) if formats
+    other than the built-in ones are asked for, and is only asked once.
+    """
+    global _plugins
+    if _plugins is None:
+        _plugins = {}
+        try:
+            from pkg_resources import iter_entry_points
+        except ImportError:
+            return _plugins
+        for entry_point in iter_entry_points(ENTRY_POINT_GROUP):
+            _plugins.setdefault(entry_point.name, entry_point)
+    return _plugins
+
+def _load_formatters(name):
+    """
+    Import the module defining the formatters for name, so that they're in
+    _formatters. Returns False if name isn't a known format.
+    """
+    if _formatters.get(name):
+        return True
+    if name in FORMATTER_MODULES:
+        __import__(FORMATTER_MODULES[name])
+    elif name in _entry_points():
+        __import__(_entry_points()[name].module_name)
+    return bool(_formatters.get(name))
+
 def find_formatter(name, default="html", multiple=False):
     """
     Find the formatter for name, and use default if it can't be found.
     If you need to represent more than one result, set multiple to True.
-    
-    Note that you MUST "from redbot.formatter import *" before calling. 
-    Yes, that's a hack that needs to be fixed.
     """
-    if name not in _formatters.keys():
+    if not _load_formatters(name):
         name = default
+        _load_formatters(name)
     # find single-preferred formatters first
     if not multiple:
         for candidate in _formatters[name]:
@@ -67,14 +112,24 @@ def find_formatter(name, default="html", multiple=False):
             return candidate
     raise RuntimeError, "Can't find a format in %s" % _formatters
 
-def available_formatters():
+def available_formatters(plugins=True):
     """
-    Return a list of the available formatter names.
-    
-    Note that you MUST "from redbot.formatter import *" before calling. 
-    Yes, that's a hack that needs to be fixed.
+    Return a list of the available formatter names, including those from
+    other packages unless plugins is False. Doesn't import them.
     """
-    return _formatters.keys()
+    names = set(FORMATTER_MODULES.keys() +
+                [name for name in _formatters if _formatters[name]])
+    if plugins:
+        names.update(_entry_points().keys())
+    return sorted(names)
+
+def has_formatter(name):
+    """
+    Return whether name is an available formatter. Only looks for formats
+    from other packages if it isn't built in.
+    """
+    return name in FORMATTER_MODULES or bool(_formatters.get(name)) \
+      or name in _entry_points()
 
 
 class Formatter(object):
@@ -109,6 +164,14 @@ class Formatter(object):
         Set the RedState to be formatted.
         """
         self.state = state
+
+    def bind_resource(self, resource):
+        """
+        Set the HttpResource to be formatted before it's run. Formatters
+        that can show results as they become available listen to its
+        events here; finish_output() is still called at the end.
+        """
+        self.set_state(resource)
         
     def done(self):
         """Clean up. Must be called by finish_output."""
@@ -238,3 +301,42 @@ class RelativeTimeTester(unittest.TestCase):
                 relative_time(self.now + delta, self.now), 
                 result
             )
+
+
+class FormatterRegistryTest(unittest.TestCase):
+    # the test loader may import this module under another name, so use
+    # the registry that the formatter modules use.
+    def test_modules(self):
+        from redbot.formatter import FORMATTER_MODULES, find_formatter
+        for name in FORMATTER_MODULES:
+            formatter = find_formatter(name, default=None, multiple=True)
+            self.assertEqual(formatter.name, name)
+
+    def test_default(self):
+        from redbot.formatter import find_formatter, has_formatter
+        self.assertEqual(find_formatter('no such format', 'txt').name, 'txt')
+        self.assertFalse(has_formatter('no such format'))
+
+    def test_plugins_once(self):
+        import sys, types
+        import redbot.formatter as formatter
+        scans = []
+        def iter_entry_points(group):
+            scans.append(group)
+            return []
+        pkg_resources = types.ModuleType('pkg_resources')
+        pkg_resources.iter_entry_points = iter_entry_points
+        orig_module = sys.modules.get('pkg_resources', None)
+        orig_plugins = formatter._plugins
+        sys.modules['pkg_resources'] = pkg_resources
+        formatter._plugins = None
+        try:
+            self.assertFalse(formatter.has_formatter('no such format'))
+            self.assertFalse(formatter.has_formatter('no such format'))
+        finally:
+            formatter._plugins = orig_plugins
+            if orig_module is None:
+                del sys.modules['pkg_resources']
+            else:
+                sys.modules['pkg_resources'] = orig_module
+        self.assertEqual(scans, [formatter.ENTRY_POINT_GROUP])
@@ -2,6 +2,9 @@
 
 """
 HAR Formatter for REDbot.
+
+Entries are written out with HarWriter as they become available, rather
+than building the whole document in memory.
 """
 
 __author__ = "Mark Nottingham <mnot@mnot.net>"
@@ -28,6 +31,7 @@ THE SOFTWARE.
 """
 
 import datetime
+import unittest
 try:
     import json
 except ImportError:
@@ -37,34 +41,110 @@ import redbot.speak as rs
 from thor.http import get_header
 from redbot import __version__
 from redbot.formatter import Formatter
+from redbot.resource.weight import page_weight
+
+
+class HarWriter(object):
+    """
+    Write a HAR document to output (a callable) incrementally.
+
+    The log header is written when the first entry is added (or when the
+    writer is closed), followed by each entry as it's added. Pages are
+    held until close(), when they're written after the entries, along with
+    the end of the document. As a result, memory use doesn't depend upon
+    the number of entries.
+
+    If indent is None, the output is compact.
+    """
+    version = "1.1"
+
+    def __init__(self, output, indent=None):
+        self.output = output
+        self.indent = indent
+        self.pages = []
+        self.entry_count = 0
+        self.started = False
+
+    def _nl(self, depth):
+        "Return the whitespace that starts a line at depth."
+        if self.indent is None:
+            return ""
+        return "\n" + " " * (self.indent * depth)
+
+    def _dump(self, value, depth):
+        "Serialise value as JSON, to appear at depth."
+        if self.indent is None:
+            return json.dumps(value, separators=(',', ':'))
+        return json.dumps(value, indent=self.indent).replace(
+            "\n", self._nl(depth)
+        )
+
+    def start(self):
+        "Write the log header."
+        self.started = True
+        space = self.indent is not None and " " or ""
+        creator = {
+            "name": "REDbot",
+            "version": __version__,
+        }
+        self.output('{%s"log":%s{' % (self._nl(1), space))
+        for name, value in [
+            ("version", self.version),
+            ("creator", creator),
+            ("browser", creator),
+        ]:
+            self.output('%s"%s":%s%s,' % (
+                self._nl(2), name, space, self._dump(value, 2)
+            ))
+        self.output('%s"entries":%s[' % (self._nl(2), space))
+
+    def add_page(self, page):
+        "Add a page (as a dictionary); it's written by close()."
+        self.pages.append(page)
+
+    def add_entry(self, entry):
+        "Write an entry (as a dictionary)."
+        if not self.started:
+            self.start()
+        self.output('%s%s%s' % (
+            self.entry_count and "," or "", self._nl(3), self._dump(entry, 3)
+        ))
+        self.entry_count += 1
+
+    def close(self):
+        "Write the pages and the end of the document."
+        if not self.started:
+            self.start()
+        space = self.indent is not None and " " or ""
+        self.output('%s],%s"pages":%s[' % (
+            self.entry_count and self._nl(2) or "", self._nl(2), space
+        ))
+        for offset, page in enumerate(self.pages):
+            self.output('%s%s%s' % (
+                offset and "," or "", self._nl(3), self._dump(page, 3)
+            ))
+        self.output('%s]%s}%s}\n' % (
+            self.pages and self._nl(2) or "", self._nl(1), self._nl(0)
+        ))
 
 
 class HarFormatter(Formatter):
     """
     Format a RED object (and any descendants) as HAR.
+
+    When bound to a resource, each linked resource's entry is written as
+    soon as its checks are done; the rest are written by finish_output().
     """
     can_multiple = True
     name = "har"
     media_type = "application/json"
+    indent = 4
     
     def __init__(self, *args, **kw):
         Formatter.__init__(self, *args, **kw)
-        self.har = {
-            'log': {
-                "version": "1.1",
-                "creator": {
-                    "name": "REDbot",
-                    "version": __version__,
-                },
-                "browser": {
-                    "name": "REDbot",
-                    "version": __version__,
-                },
-                "pages": [],
-                "entries": [],
-            },
-        }
-        self.last_id = 0
+        self.writer = HarWriter(self.output, self.indent)
+        self.page_id = 1 # there's only one page
+        self.written = set() # ids of the states written so far
 
     def start_output(self):
         pass
@@ -75,16 +155,32 @@ class HarFormatter(Formatter):
     def feed(self, state, sample):
         pass
 
+    def bind_resource(self, resource):
+        Formatter.bind_resource(self, resource)
+        resource.on('linked', self.bind_linked)
+
+    def bind_linked(self, linked, tag):
+        "Write linked's entry when its checks are done."
+        def tasks_done():
+            if self.output is not None:
+                self.write_entry(linked)
+        linked.on('tasks_done', tasks_done)
+
+    def write_entry(self, state):
+        "Write the entry for state, unless it's incomplete or written."
+        if not state.response.complete or id(state) in self.written:
+            return
+        self.written.add(id(state))
+        self.add_entry(state, self.page_id)
+
     def finish_output(self):
         "Fill in the template with RED's results."
         if self.state.response.complete:
-            page_id = self.add_page(self.state)
-            self.add_entry(self.state, page_id)
+            self.write_entry(self.state)
+            self.add_page(self.state)
             for linked_state in [d[0] for d in self.state.linked]:
-                # filter out incomplete responses
-                if linked_state.response.complete:
-                    self.add_entry(linked_state, page_id)
-        self.output(json.dumps(self.har, indent=4))
+                self.write_entry(linked_state)
+        self.writer.close()
         self.done()
         
     def add_entry(self, state, page_ref=None):
@@ -147,11 +243,11 @@ class HarFormatter(Formatter):
             'cache': cache,
             'timings': timings,
         })
-        self.har['log']['entries'].append(entry)
+        self.writer.add_entry(entry)
 
         
     def add_page(self, state):
-        page_id = self.last_id + 1
+        page_id = self.page_id
         page = {
             "startedDateTime": isoformat(state.request.start_time),
             "id": "page%s" % page_id,
@@ -161,7 +257,9 @@ class HarFormatter(Formatter):
                 "onLoad": -1,
             },
         }
-        self.har['log']['pages'].append(page)
+        if state.linked:
+            page['_pageWeight'] = page_weight(state)
+        self.writer.add_page(page)
         return page_id
 
     def format_headers(self, hdrs):
@@ -188,6 +286,34 @@ class HarFormatter(Formatter):
             out.append(msg)
         return out
 
+class CompactHarFormatter(HarFormatter):
+    """
+    Format a RED object (and any descendants) as HAR, without indentation.
+    """
+    name = "har_compact"
+    indent = None
+
+
+class HarWriterTest(unittest.TestCase):
+    def test_writer(self):
+        entries = [{"request": {"url": "http://example.com/%s" % i}}
+                   for i in range(3)]
+        page = {"id": "page1", "title": ""}
+        for indent in [None, 4]:
+            for entry_count in [0, 3]:
+                out = []
+                writer = HarWriter(out.append, indent)
+                for entry in entries[:entry_count]:
+                    writer.add_entry(entry)
+                writer.add_page(page)
+                writer.close()
+                har = json.loads("".join(out))
+                self.assertEqual(har['log']['entries'], entries[:entry_count])
+                self.assertEqual(har['log']['pages'], [page])
+                self.assertEqual(har['log']['creator']['name'], "REDbot")
+                self.assertEqual("\n" in "".join(out)[:-1], indent == 4)
+
+
 def isoformat(timestamp):
     class TZ(datetime.tzinfo):
         def utcoffset(self, dt): 
@@ -43,14 +43,16 @@ import thor
 import thor.http.error as httperr
 
 import redbot.speak as rs
-from redbot import defns, __version__
+from redbot import __version__
 from redbot.formatter import Formatter, html_header, relative_time, f_num
+from redbot.resource.weight import page_weight
 
 nl = u"\n"
 
 # Configuration; override to change.
 static_root = u'static' # where status resources are located
 extra_dir = u'extra' # where extra resources are located
+static_versions = {} # static path: content hash, to version their URLs
 
 # TODO: make subrequests explorable
 
@@ -82,6 +84,8 @@ class BaseHtmlFormatter(Formatter):
             descend = u''
         self.output(html_header.__doc__ % {
             u'static': static_root,
+            u'style_uri': static_uri(u'style.css'),
+            u'script_uri': static_uri(u'script.js'),
             u'version': __version__,
             u'html_uri': e_html(self.uri),
             u'js_uri': e_js(self.uri),
@@ -233,13 +237,17 @@ class SingleEntryHtmlFormatter(BaseHtmlFormatter):
         'application/rss+xml': "http://feedvalidator.org/check.cgi?url=%s",
     }
 
-    # HTML template for the main response body
-    template = u"""\
+    # HTML templates for the main response body. When the results are
+    # streamed (see bind_resource), each part is output as soon as it can
+    # be; otherwise, they're output together as template.
+    response_template = u"""\
     <div id="left_column">
     <span class="help">These are the response headers; hover over each one
     for an explanation of what it does.</span>
     <pre id='response'>%(response)s</pre>
+"""
 
+    options_template = u"""
     <p class="options">
         <span class='help'>Here, you can see the response body, a HAR document for the request, and when appropriate, validate the response or check its assets (such as referenced images, stylesheets and scripts).</span>
         %(options)s
@@ -250,7 +258,13 @@ class SingleEntryHtmlFormatter(BaseHtmlFormatter):
     <div id='details'>
     <span class='help right'>These notes explain what REDbot has found
     about your URL; hover over each one for a detailed explanation.</span>
+"""
+
+    notes_template = u"""\
     %(notes)s
+"""
+
+    body_template = u"""\
     </div>
     </div>
 
@@ -266,6 +280,9 @@ class SingleEntryHtmlFormatter(BaseHtmlFormatter):
     </body></html>
     """
 
+    template = response_template + options_template + notes_template + \
+      body_template
+
     error_template = u"""\
 
     <p class="error">
@@ -275,17 +292,22 @@ class SingleEntryHtmlFormatter(BaseHtmlFormatter):
     
     name = "html"
 
+    # a quoted string in the body sample, which might be a link
+    quoted_string = re.compile(r"""(?:"([^"\n]*)"|'([^'\n]*)')""")
+
     def __init__(self, *args, **kw):
         BaseHtmlFormatter.__init__(self, *args, **kw)
-        self.body_sample = ""  # uncompressed
+        self.body_sample = u""  # decoded
         self.body_sample_size = 1024 * 128 # how big to allow the sample to be
         self.sample_seen = 0
         self.sample_complete = True
+        self.streamed = None # how far we've got streaming; see bind_resource
+        self.notes_shown = 0 # how many of the state's notes have been output
 
     def feed(self, msg, chunk):
         """
-        Store the first self.sample_size bytes of the 
-        uncompressed response.
+        Store the first self.sample_size characters of the 
+        decoded response.
         """
         if self.sample_seen + len(chunk) < self.body_sample_size:
             self.body_sample += chunk
@@ -298,15 +320,62 @@ class SingleEntryHtmlFormatter(BaseHtmlFormatter):
         else:
             self.sample_complete = False
         
+    def bind_resource(self, resource):
+        """
+        Stream the results for resource: the response headers when they've
+        been checked, the body-related options and notes when the response
+        is done, and the notes for each active check as it finishes.
+        """
+        BaseHtmlFormatter.bind_resource(self, resource)
+        resource.on('response_start', self.stream_response)
+        resource.on('response_done', self.stream_options)
+        resource.on('check_done', self.stream_notes)
+
+    def stream_response(self):
+        if self.output is None:
+            return
+        self.header_presenter = HeaderPresenter(self.state.request.uri)
+        self.output(self.response_template % {
+            'response': self.format_response(self.state),
+        })
+        self.streamed = 'response'
+
+    def stream_options(self):
+        if self.output is None or self.streamed != 'response' or \
+          not self.state.response.complete:
+            return
+        self.output(self.options_template % {
+            'options': self.format_options(self.state),
+        })
+        self.streamed = 'notes'
+        self.stream_notes()
+
+    def stream_notes(self, subreq=None):
+        "Output the notes that haven't been output yet."
+        if self.output is None or self.streamed != 'notes':
+            return
+        notes = self.state.notes[self.notes_shown:]
+        self.notes_shown += len(notes)
+        if notes:
+            self.output(self.notes_template % {
+                'notes': self.format_notes(self.state, notes),
+            })
+
     def finish_output(self):
         self.final_status()
-        if self.state.response.complete:
+        if self.streamed == 'notes':
+            self.stream_notes()
+            self.output(self.body_template % {
+                'body': self.format_body_sample(self.state),
+                'footer': self.format_footer(),
+                'hidden_list': self.format_hidden_list(),
+            })
+        elif self.state.response.complete and not self.streamed:
             self.header_presenter = HeaderPresenter(self.state.request.uri)
             self.output(self.template % {
                 'response': self.format_response(self.state),
                 'options': self.format_options(self.state),
-                'notes': nl.join([self.format_category(cat, self.state) \
-                    for cat in self.note_categories]),
+                'notes': self.format_notes(self.state),
                 'body': self.format_body_sample(self.state),
                 'footer': self.format_footer(),
                 'hidden_list': self.format_hidden_list(),
@@ -334,6 +403,8 @@ class SingleEntryHtmlFormatter(BaseHtmlFormatter):
                   "Unknown incomplete response error %s" % (
                      self.state.response.http_error
                 )
+            if self.streamed:
+                self.output(u"</div>\n")
         self.done()
 
     def format_response(self, state):
@@ -354,6 +425,7 @@ class SingleEntryHtmlFormatter(BaseHtmlFormatter):
 
     def format_header(self, name, value, offset):
         "Return an individual HTML header as HTML"
+        from redbot import defns # only needed here, and it's big
         token_name = "header-%s" % name.lower()
         py_name = "HDR_" + name.upper().replace("-", "_").encode('ascii', 'ignore')
         if hasattr(defns, py_name) and token_name not in \
@@ -371,47 +443,74 @@ class SingleEntryHtmlFormatter(BaseHtmlFormatter):
         )
 
     def format_body_sample(self, state):
-        """show the stored body sample"""
-        try:
-            uni_sample = unicode(self.body_sample,
-                                 state.response.character_encoding, 
-                                 'ignore'
-            )
-        except LookupError:
-            uni_sample = unicode(self.body_sample, 'utf-8', 'ignore')
-        safe_sample = e_html(uni_sample)
+        """
+        Show the stored body sample, with quoted links in it linked to
+        their own results.
+
+        This is done in one pass over the sample; at each quote, the string
+        up to the matching quote is looked up in the set of links.
+        """
+        safe_sample = e_html(self.body_sample)
         message = ""
-        for tag, link_set in state.links.items():
-            for link in link_set:
-                def link_to(matchobj):
-                    try:
-                        qlink = urljoin(state.response.base_uri, link)
-                    except ValueError, why:
-                        pass # TODO: pass link problem upstream?
-                             # e.g., ValueError("Invalid IPv6 URL")
-                    return r"%s<a href='%s' class='nocode'>%s</a>%s" % (
-                        matchobj.group(1),
-                        u"?uri=%s&req_hdr=Referer%%3A%s" % (
-                            e_query_arg(qlink),
-                            e_query_arg(state.response.base_uri)
-                        ),
-                        e_html(link),
-                        matchobj.group(1)
-                    )
-                safe_sample = re.sub(r"(['\"])%s\1" % \
-                    re.escape(link), link_to, safe_sample)
+        links = set()
+        for link_set in state.links.values():
+            links.update(link_set)
+        referer = e_query_arg(state.response.base_uri)
+        out = []
+        done = 0 # how much of the sample is in out
+        pos = 0
+        while links:
+            match = self.quoted_string.search(safe_sample, pos)
+            if not match:
+                break
+            if match.group(1) is None:
+                link, quote = match.group(2), u"'"
+            else:
+                link, quote = match.group(1), u'"'
+            qlink = None
+            if link in links:
+                try:
+                    qlink = urljoin(state.response.base_uri, link)
+                except ValueError:
+                    pass # TODO: pass link problem upstream?
+                         # e.g., ValueError("Invalid IPv6 URL")
+            if qlink is None:
+                pos = match.start() + 1 # the closing quote might open one
+                continue
+            out.append(safe_sample[done:match.start()])
+            out.append(u"%s<a href='%s' class='nocode'>%s</a>%s" % (
+                quote,
+                u"?uri=%s&req_hdr=Referer%%3A%s" % (
+                    e_query_arg(qlink), referer
+                ),
+                e_html(link),
+                quote
+            ))
+            done = pos = match.end()
+        out.append(safe_sample[done:])
+        safe_sample = u"".join(out)
         if not self.sample_complete:
             message = \
 "<p class='btw'>RED isn't showing the whole body, because it's so big!</p>"
         return """<pre class="prettyprint">%s</pre>\n%s""" % (
             safe_sample, message)
 
-    def format_category(self, category, state):
+    def format_notes(self, state, notes=None):
+        """
+        Return notes (by default, all of state's notes) as HTML lists, by
+        category.
+        """
+        return nl.join([self.format_category(cat, state, notes) \
+            for cat in self.note_categories])
+
+    def format_category(self, category, state, notes=None):
         """
         For a given category, return all of the non-detail 
-        notes in it as an HTML list.
+        notes in it (or in notes, if given) as an HTML list.
         """
-        notes = [note for note in state.notes if note.category == category]
+        if notes is None:
+            notes = state.notes
+        notes = [note for note in notes if note.category == category]
         if not notes:
             return nl
         out = []
@@ -585,6 +684,8 @@ class TableHtmlFormatter(BaseHtmlFormatter):
         %(options)s
     </p>
 
+    %(weight)s
+
     <div id='details'>
     %(problems)s
     </div>
@@ -602,11 +703,13 @@ class TableHtmlFormatter(BaseHtmlFormatter):
     def __init__(self, *args, **kw):
         BaseHtmlFormatter.__init__(self, *args, **kw)
         self.problems = []
+        self.problem_index = {} # note identity: offset in self.problems
 
     def finish_output(self):
         self.final_status()
         self.output(self.template % {
             'table': self.format_tables(self.state),
+            'weight': self.format_page_weight(self.state),
             'problems': self.format_problems(),
             'options': self.format_options(self.state),
             'footer': self.format_footer(),
@@ -620,6 +723,7 @@ class TableHtmlFormatter(BaseHtmlFormatter):
           ('frame', u'Frame Links'),
           ('iframe', u'IFrame Links'),
           ('img', u'Image Links'),
+          ('css', u'CSS Links'),
     ]
     def format_tables(self, state):
         out = [self.format_table_header()]
@@ -701,9 +805,11 @@ class TableHtmlFormatter(BaseHtmlFormatter):
             out.append(u"<td>")
             pr_enum = []
             for problem in problems:
-                if problem not in self.problems:
+                identity = problem.identity()
+                if identity not in self.problem_index:
+                    self.problem_index[identity] = len(self.problems)
                     self.problems.append(problem)
-                pr_enum.append(self.problems.index(problem))
+                pr_enum.append(self.problem_index[identity])
             # add the problem number to the <tr> so we can highlight
             out[0] = out[0] % u" ".join([u"%d" % p for p in pr_enum])
             # append the actual problem numbers to the final <td>
@@ -762,14 +868,13 @@ class TableHtmlFormatter(BaseHtmlFormatter):
             return u'<td>%s</td>' % f_num(value, by1024=True)
 
     def format_yes_no(self, value):
-        icon_tpl = u'<td><img src="%s/icon/%%s" alt="%%s"/></td>' % \
-            static_root
+        icon_tpl = u'<td><img src="%s" alt="%s"/></td>'
         if value is True:
-            return icon_tpl % (u"accept1.png", u"yes")
+            return icon_tpl % (static_uri(u"icon/accept1.png"), u"yes")
         elif value is False:
-            return icon_tpl % (u"remove-16.png", u"no")
+            return icon_tpl % (static_uri(u"icon/remove-16.png"), u"no")
         elif value is None:
-            return icon_tpl % (u"help1.png", u"unknown")
+            return icon_tpl % (static_uri(u"icon/help1.png"), u"unknown")
         else:
             raise AssertionError, 'unknown value'
 
@@ -796,6 +901,36 @@ class TableHtmlFormatter(BaseHtmlFormatter):
              or u"<br>" for o in options]
         )
 
+    def format_page_weight(self, state):
+        "Summarise the weight of the page and its linked resources."
+        if not state.linked:
+            return u""
+        weight = page_weight(state)
+        out = [u"<div id='weight'><h2>Page Weight</h2>"]
+        out.append(u"<p>%s resources; %s transferred, %s of which could be "
+            u"saved by compression, and %s of which can't be cached.</p>" % (
+                weight['resources'],
+                f_num(weight['transfer_bytes'], by1024=True),
+                f_num(weight['savable_bytes'], by1024=True),
+                f_num(weight['uncacheable_bytes'], by1024=True),
+            )
+        )
+        if weight['offenders']:
+            out.append(u"<table><tr><th>URI</th><th>size</th>"
+                       u"<th>savable</th><th>cacheable</th></tr>")
+            for offender in weight['offenders']:
+                out.append(u'<tr><td class="uri"><a href="?%s">%s</a></td>' \
+                  u'%s%s%s</tr>' % (
+                    self.req_qs(offender['uri']),
+                    e_html(offender['uri']),
+                    self.format_size(offender['transfer_bytes']),
+                    self.format_size(offender['savable_bytes']),
+                    self.format_yes_no(not offender['uncacheable']),
+                ))
+            out.append(u"</table>")
+        out.append(u"</div>")
+        return nl.join(out)
+
     def format_problems(self):
         out = [u'<br /><h2>Notes</h2><ol>']
         for m in self.problems:
@@ -804,16 +939,27 @@ class TableHtmlFormatter(BaseHtmlFormatter):
                     m.level, 
                     e_html(m.subject), 
                     id(m), 
-                    e_html(m.summary[self.lang] % m.vars)
+                    e_html(m.show_summary(self.lang))
                 )
             )
             self.hidden_text.append(
-                (u"msgid-%s" % id(m), m.text[self.lang] % m.vars)
+                (u"msgid-%s" % id(m), m.show_text(self.lang))
             )
         out.append(u"</ol>\n")
         return nl.join(out)
 
 
+def static_uri(path):
+    """
+    Return the URI for a static resource, carrying its content hash if
+    it's known, so that it can be cached for a long time.
+    """
+    version = static_versions.get(path, None)
+    if version:
+        return u"%s/%s?v=%s" % (static_root, path, version)
+    return u"%s/%s" % (static_root, path)
+
+
 # Escaping functions. 
 uri_gen_delims = r":/?#[]@"
 uri_sub_delims = r"!$&'()*+,;="
@@ -5,7 +5,7 @@ u"""\
 	<title>REDbot: &lt;%(html_uri)s&gt;</title>
 	<meta http-equiv="content-type" content="text/html; charset=utf-8" />
 	<meta name="ROBOTS" content="INDEX, NOFOLLOW" />
-    <link rel="stylesheet" type="text/css" href="%(static)s/style.css">
+    <link rel="stylesheet" type="text/css" href="%(style_uri)s">
 	<!--[if IE]> 
     <style type="text/css">
         #right_column {
@@ -13,7 +13,7 @@ u"""\
             float: left;
     </style>
     <![endif]-->
-    <script src='%(static)s/script.js#%(config)s' type="text/javascript"></script>
+    <script src='%(script_uri)s#%(config)s' type="text/javascript"></script>
     %(extra_js)s
 </head>
 
@@ -0,0 +1,157 @@
+#!/usr/bin/env python
+
+"""
+JSON Lines Formatter for REDbot.
+
+Writes one compact JSON record per checked resource, for bulk processing.
+"""
+
+__author__ = "Mark Nottingham <mnot@mnot.net>"
+__copyright__ = """\
+Copyright (c) 2008-2013 Mark Nottingham
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+"""
+
+import json
+import unittest
+
+from redbot.formatter import Formatter
+from redbot.resource.weight import page_weight
+from redbot.speak import compact_notes
+
+
+class JsonLinesFormatter(Formatter):
+    """
+    Format a RED object (and any descendants) as JSON Lines; one record per
+    resource. See format_record for what's in each.
+
+    When bound to a resource, each linked resource's record is written as
+    soon as its checks are done; the rest are written by finish_output().
+    """
+    can_multiple = True
+    name = "jsonl"
+    media_type = "application/x-ndjson"
+
+    def __init__(self, *args, **kw):
+        Formatter.__init__(self, *args, **kw)
+        self.written = set() # ids of the states written so far
+
+    def start_output(self):
+        pass
+
+    def status(self, msg):
+        pass
+
+    def feed(self, state, sample):
+        pass
+
+    def bind_resource(self, resource):
+        Formatter.bind_resource(self, resource)
+        resource.on('linked', self.bind_linked)
+
+    def bind_linked(self, linked, tag):
+        "Write linked's record when its checks are done."
+        def tasks_done():
+            if self.output is not None:
+                self.write_record(linked, tag)
+        linked.on('tasks_done', tasks_done)
+
+    def finish_output(self):
+        self.write_record(self.state)
+        for linked_state, tag in self.state.linked:
+            self.write_record(linked_state, tag)
+        self.done()
+
+    def write_record(self, state, tag=None):
+        "Write the record for state, unless it's already been written."
+        if id(state) in self.written:
+            return
+        self.written.add(id(state))
+        self.output(json.dumps(
+            self.format_record(state, tag),
+            separators=(',', ':'),
+            default=unicode
+        ) + "\n")
+
+    @staticmethod
+    def format_record(state, tag=None):
+        """
+        Return a dictionary describing state. tag is the kind of link it
+        was found in, if it's a linked resource. Times are in seconds, and
+        notes are [note_id, subject, vars]. If state has linked resources,
+        its record includes their page weight; see
+        redbot.resource.weight.page_weight.
+        """
+        request, response = state.request, state.response
+        record = {
+            'uri': request.uri,
+            'tag': tag,
+            'status': None,
+            'error': None,
+        }
+        if not response.complete:
+            if response.http_error is not None:
+                record['error'] = response.http_error.desc
+            else:
+                record['error'] = u"response incomplete"
+            return record
+        record.update({
+            'status': response.status_code,
+            'start': request.start_time,
+            'wait': response.start_time - request.start_time,
+            'elapsed': response.complete_time - request.start_time,
+            'size': response.payload_len,
+            'store_shared': response.store_shared,
+            'store_private': response.store_private,
+            'freshness_lifetime': response.freshness_lifetime,
+            'age': response.age,
+            'ims_support': state.ims_support,
+            'inm_support': state.inm_support,
+            'gzip_support': state.gzip_support,
+            'partial_support': state.partial_support,
+            'notes': compact_notes(state.notes),
+        })
+        if state.linked:
+            record['page_weight'] = page_weight(state)
+        return record
+
+
+class JsonLinesFormatterTest(unittest.TestCase):
+    def test_records(self):
+        from redbot.formatter.render_bench import make_run
+        run = make_run(assets=2, notes=3)
+        out = []
+        formatter = JsonLinesFormatter(
+            u"http://redbot.example/", run.request.uri, [], 'en', out.append
+        )
+        formatter.set_state(run)
+        formatter.finish_output()
+        records = [json.loads(line) for line in "".join(out).splitlines()]
+        self.assertEqual([r['uri'] for r in records], [
+            u"http://www.example.com/",
+            u"http://www.example.com/asset/0",
+            u"http://www.example.com/asset/1",
+        ])
+        self.assertEqual(records[1]['tag'], 'img')
+        self.assertEqual(records[0]['status'], u"200")
+        self.assertEqual(len(records[0]['notes']), 3)
+        self.assertFalse('response' in records[0]['notes'][0][2])
+        self.assertEqual(records[0]['page_weight']['resources'], 3)
+        self.assertFalse('page_weight' in records[1])
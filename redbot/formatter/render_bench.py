@@ -0,0 +1,164 @@
+#!/usr/bin/env python
+
+"""
+Rendering benchmark for the formatters.
+
+Builds a synthetic descend run (a page and many linked assets, each with
+a number of notes), and times the HTML, text and HAR formatters rendering
+it. Nothing is fetched.
+
+Run as a script to see a report; see --help.
+"""
+
+__author__ = "Mark Nottingham <mnot@mnot.net>"
+__copyright__ = """\
+Copyright (c) 2008-2013 Mark Nottingham
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+"""
+
+import re
+from timeit import default_timer as timer
+import types
+
+import redbot.speak as rs
+from redbot.resource import HttpResource
+from redbot.formatter import find_formatter
+import redbot.formatter.html
+import redbot.formatter.text
+import redbot.formatter.har
+
+### configuration
+ASSETS = 500  # linked resources in the run
+NOTES = 10  # notes per resource
+REPEAT = 3  # timings to take the best of
+FORMATS = ['html', 'txt', 'har']
+
+NOTE_VAR = re.compile(r"%\((\w+)\)")
+
+
+def note_classes():
+    "Return a sorted list of the Note classes in redbot.speak."
+    return sorted([
+        v for (n, v) in vars(rs).items()
+        if type(v) is types.ClassType and issubclass(v, rs.Note)
+        and v is not rs.Note
+    ], key=lambda v: v.__name__)
+
+
+def make_run(assets=ASSETS, notes=NOTES):
+    """
+    Return an HttpResource that looks like a finished descend run, with
+    assets linked resources and notes notes on each. Vars repeat, so that
+    some notes are the same across resources.
+    """
+    classes = note_classes()
+    now = 1000000000.0
+    def make_resource(uri, offset):
+        resource = HttpResource(uri, descend=True)
+        resource.request.start_time = now
+        response = resource.response
+        response.status_code = u"200"
+        response.status_phrase = u"OK"
+        response.version = "1.1"
+        response.set_headers([(u"Content-Type", u"text/html")])
+        response.start_time = response.complete_time = now
+        response.header_length = 100
+        response.complete = True
+        for i in range(notes):
+            cls = classes[(offset + i) % len(classes)]
+            names = set(NOTE_VAR.findall(cls.summary['en'] + cls.text['en']))
+            resource.add_note('header-none', cls, **dict(
+                [(name, u"%s <%s>" % (name, i % 3)) for name in names]
+            ))
+        return resource
+    page = make_resource(u"http://www.example.com/", 0)
+    for offset in range(assets):
+        page.linked.append((make_resource(
+            u"http://www.example.com/asset/%s" % offset, offset
+        ), 'img'))
+    return page
+
+
+def render(format_name, state):
+    "Render state with the named formatter. Returns the output length."
+    out = []
+    formatter = find_formatter(format_name, multiple=True)(
+        u"http://redbot.example/", state.request.uri, [], 'en', out.append
+    )
+    formatter.set_state(state)
+    formatter.finish_output()
+    return sum([len(chunk) for chunk in out])
+
+
+def bench(assets=ASSETS, notes=NOTES, repeat=REPEAT, formats=None):
+    """
+    Time rendering a run with each format. Returns a list of
+    (format name, best time for the first rendering, best time for a
+    second rendering). A fresh run is built for each repetition, so that
+    the first rendering includes anything notes cache.
+    """
+    results = []
+    for format_name in formats or FORMATS:
+        first = second = None
+        for _ in range(repeat):
+            state = make_run(assets, notes)
+            start = timer()
+            render(format_name, state)
+            elapsed = timer() - start
+            if first is None or elapsed < first:
+                first = elapsed
+            start = timer()
+            render(format_name, state)
+            elapsed = timer() - start
+            if second is None or elapsed < second:
+                second = elapsed
+        results.append((format_name, first, second))
+    return results
+
+
+def main():
+    from optparse import OptionParser
+    usage = "Usage: %prog [options] [format ...]"
+    opt_parser = OptionParser(usage=usage)
+    opt_parser.set_defaults(assets=ASSETS, notes=NOTES, repeat=REPEAT)
+    opt_parser.add_option(
+        "-a", "--assets", type="int", dest="assets",
+        help="linked resources in the run (default %s)" % ASSETS
+    )
+    opt_parser.add_option(
+        "-n", "--notes", type="int", dest="notes",
+        help="notes per resource (default %s)" % NOTES
+    )
+    opt_parser.add_option(
+        "-r", "--repeat", type="int", dest="repeat",
+        help="timings to take the best of (default %s)" % REPEAT
+    )
+    (options, args) = opt_parser.parse_args()
+    print "%s resources, %s notes" % (
+        options.assets + 1, (options.assets + 1) * options.notes
+    )
+    for format_name, first, second in bench(
+        options.assets, options.notes, options.repeat, args
+    ):
+        print "%-6s first %.4fs, again %.4fs" % (format_name, first, second)
+
+
+if "__main__" == __name__:
+    main()
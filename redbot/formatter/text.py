@@ -35,7 +35,8 @@ import textwrap
 import thor.http.error as httperr
 import redbot.speak as rs
 
-from redbot.formatter import Formatter
+from redbot.formatter import Formatter, f_num
+from redbot.resource.weight import page_weight
 
 nl = u"\n"
 
@@ -57,6 +58,7 @@ class BaseTextFormatter(Formatter):
           ('frame', 'Frame Links'),
           ('iframe', 'IFrame Links'),
           ('img', 'Image Links'),
+          ('css', 'CSS Links'),
     ]
 
     error_template = "Error: %s\n"
@@ -210,16 +212,39 @@ class TextListFormatter(BaseTextFormatter):
                 sep, heading, len(droids), sep
             ))
             if droids:
-                droids.sort(key=operator.attrgetter('uri'))
+                droids.sort(key=operator.attrgetter('request.uri'))
                 for droid in droids:
                     self.output(self.format_uri(droid) + nl + nl)
                     self.output(self.format_headers(droid) + nl + nl)
                     self.output(self.format_recommendations(droid) + nl + nl)
+        if self.state.linked:
+            self.output("%s\nPage Weight\n%s\n" % (sep, sep))
+            self.output(self.format_page_weight(self.state) + nl)
         self.done()
 
     def format_uri(self, state):
         return self.colorize("uri", state.request.uri)
 
+    def format_page_weight(self, state):
+        weight = page_weight(state)
+        out = [
+            u"* resources: %s" % weight['resources'],
+            u"* transferred: %s bytes" % f_num(weight['transfer_bytes']),
+            u"* savable by compression: %s bytes" % \
+              f_num(weight['savable_bytes']),
+            u"* uncacheable: %s bytes" % f_num(weight['uncacheable_bytes']),
+        ]
+        if weight['offenders']:
+            out.append(u"* top offenders:")
+        for offender in weight['offenders']:
+            out.append(u"  * %s (%s bytes; %s savable%s)" % (
+                self.colorize("uri", offender['uri']),
+                f_num(offender['transfer_bytes']),
+                f_num(offender['savable_bytes']),
+                offender['uncacheable'] and u"; uncacheable" or u""
+            ))
+        return nl.join(out)
+
 
 class VerboseTextListFormatter(TextListFormatter):
     name = "txt_verbose"
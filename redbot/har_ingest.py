@@ -0,0 +1,434 @@
+#!/usr/bin/env python
+
+"""
+HAR ingestion.
+
+Reads HAR 1.2 files (such as those written by HarFormatter), rebuilds the
+HttpRequest and HttpResponse for each entry, runs RED's passive checks over
+them and annotates the entries with RED's notes (as '_red_messages', in the
+same shape that HarFormatter uses).
+
+Entries are read with a streaming parser, so large HAR files don't need to
+fit into memory; see HarReader.
+"""
+
+__author__ = "Mark Nottingham <mnot@mnot.net>"
+__copyright__ = """\
+Copyright (c) 2008-2013 Mark Nottingham
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+"""
+
+import base64
+import binascii
+import calendar
+import codecs
+import json
+import re
+from StringIO import StringIO
+import unittest
+
+import redbot.speak as rs
+from redbot.lint import passive_checks, pool_map, CHUNKSIZE
+from redbot.message import HttpRequest, HttpResponse
+
+### configuration
+READ_SIZE = 64 * 1024
+
+WHITESPACE = re.compile(r"[ \t\n\r]*")
+ISO_DATE = re.compile(r"""^(\d{4})-(\d\d)-(\d\d)T(\d\d):(\d\d):(\d\d)(\.\d+)?
+                          (Z|[+\-]\d\d:?\d\d)?$""", re.VERBOSE)
+
+
+class HarError(ValueError):
+    "The HAR document couldn't be parsed."
+    pass
+
+
+class HarReader(object):
+    """
+    Incrementally read a HAR document from the file-like object fd.
+
+    Iterating over a HarReader generates (name, value) for each member of
+    the 'log' object, in document order, except that each member of the
+    'entries' array is generated as ('entry', value) as soon as it's been
+    read, rather than reading the whole array in at once.
+    """
+    def __init__(self, fd, read_size=READ_SIZE):
+        self.fd = fd
+        self.read_size = read_size
+        self.decoder = json.JSONDecoder()
+        self.text_decoder = codecs.getincrementaldecoder('utf-8')()
+        self.buf = u""
+        self.pos = 0
+        self.eof = False
+
+    def __iter__(self):
+        self._expect(u"{")
+        for name in self._members():
+            if name != u"log":
+                self._value() # ignore anything else at the top level
+                continue
+            self._expect(u"{")
+            for log_name in self._members():
+                if log_name == u"entries":
+                    self._expect(u"[")
+                    for entry in self._elements():
+                        yield u"entry", entry
+                else:
+                    yield log_name, self._value()
+
+    def _fill(self, size=None):
+        """
+        Read size (default: read_size) more into the buffer; return False if
+        at EOF.
+        """
+        if self.eof:
+            return False
+        if self.pos > len(self.buf) / 2:
+            self.buf = self.buf[self.pos:]
+            self.pos = 0
+        data = self.fd.read(size or self.read_size)
+        if not data:
+            self.eof = True
+            data = ""
+        try:
+            if not isinstance(data, unicode):
+                # multibyte characters can be split across reads
+                data = self.text_decoder.decode(data, self.eof)
+        except UnicodeDecodeError, why:
+            raise HarError, "Bad UTF-8: %s" % why
+        self.buf += data
+        return not self.eof
+
+    def _peek(self):
+        "Skip whitespace and return the next character, or None at EOF."
+        while True:
+            self.pos = WHITESPACE.match(self.buf, self.pos).end()
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self._fill():
+                return None
+
+    def _expect(self, char):
+        "Consume char, raising HarError if it isn't next."
+        found = self._peek()
+        if found != char:
+            raise HarError, "Expected %r at %s, found %r" % (
+                char, self.pos, found)
+        self.pos += 1
+
+    def _value(self):
+        "Decode and return the next JSON value."
+        self._peek()
+        # each retry decodes from the start of the value again, so double
+        # the amount read each time to keep large values linear.
+        read_size = self.read_size
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buf, self.pos)
+            except ValueError:
+                if self._fill(read_size):
+                    read_size *= 2
+                    continue
+                raise HarError, "Incomplete JSON value at %s" % self.pos
+            # a number at the end of the buffer might not be complete
+            if end == len(self.buf) and self._fill(read_size):
+                read_size *= 2
+                continue
+            self.pos = end
+            return value
+
+    def _members(self):
+        "Generate member names of an object; caller consumes the values."
+        if self._peek() == u"}":
+            self.pos += 1
+            return
+        while True:
+            name = self._value()
+            self._expect(u":")
+            yield name
+            if self._peek() == u",":
+                self.pos += 1
+            else:
+                self._expect(u"}")
+                return
+
+    def _elements(self):
+        "Generate the values in an array."
+        if self._peek() == u"]":
+            self.pos += 1
+            return
+        while True:
+            yield self._value()
+            if self._peek() == u",":
+                self.pos += 1
+            else:
+                self._expect(u"]")
+                return
+
+
+def parse_isodate(value):
+    "Parse an ISO 8601 date into a UTC timestamp. Raises ValueError if bad."
+    match = ISO_DATE.match(value or "")
+    if not match:
+        raise ValueError, "Bad date: %r" % value
+    year, month, day, hour, minute, sec, frac, tz = match.groups()
+    timestamp = calendar.timegm(
+        [int(i) for i in [year, month, day, hour, minute, sec]])
+    if frac:
+        timestamp += float(frac)
+    if tz and tz != "Z":
+        offset = int(tz[1:3]) * 3600 + int(tz[-2:]) * 60
+        timestamp += -offset if tz[0] == "+" else offset
+    return timestamp
+
+
+def har_headers(hdrs):
+    "Convert a list of HAR header objects to a list of (name, value) bytes."
+    return [(h['name'].encode('iso-8859-1', 'replace'),
+             h['value'].encode('iso-8859-1', 'replace')) for h in hdrs]
+
+
+def har_body(content):
+    """
+    Return the body bytes held in a HAR content object, or None if it isn't
+    present.
+    """
+    text = content.get('text', None)
+    if text is None:
+        return None
+    if content.get('encoding', None) == 'base64':
+        try:
+            return base64.b64decode(text)
+        except (TypeError, binascii.Error):
+            return None
+    charset = 'utf-8'
+    for param in content.get('mimeType', '').split(";")[1:]:
+        name, value = (param.split("=", 1) + [""])[:2]
+        if name.strip().lower() == 'charset':
+            charset = value.strip().strip('"')
+    try:
+        return text.encode(charset)
+    except (LookupError, UnicodeError):
+        return text.encode('utf-8')
+
+
+def entry_to_messages(entry):
+    """
+    Rebuild the HttpRequest and HttpResponse for a HAR entry, running the
+    passive checks on them. Returns (request, response).
+    """
+    notes = rs.Notes()
+    har_req = entry.get('request', {})
+    har_res = entry.get('response', {})
+    try:
+        start_time = parse_isodate(entry.get('startedDateTime'))
+    except ValueError:
+        start_time = None
+
+    request = HttpRequest(notes)
+    request.method = har_req.get('method', u"GET").encode('ascii', 'replace')
+    request.version = har_req.get('httpVersion', u"").split("/")[-1]
+    request.start_time = start_time
+    request.set_iri(har_req.get('url', u""))
+    request.set_headers(har_headers(har_req.get('headers', [])))
+
+    response = HttpResponse(notes)
+    response.version = har_res.get('httpVersion', u"").split("/")[-1]
+    response.status_code = unicode(har_res.get('status', u""))
+    response.status_phrase = har_res.get('statusText', u"")
+    response.is_head_response = request.method == "HEAD"
+    response.base_uri = request.uri or ""
+    if start_time is not None:
+        wait = entry.get('timings', {}).get('wait', 0)
+        response.start_time = start_time + max(wait, 0) / 1000.0
+    response.set_headers(har_headers(har_res.get('headers', [])))
+    passive_checks(response, request)
+
+    body = har_body(har_res.get('content', {}))
+    if body is not None and (
+      not response.parsed_headers.get('content-encoding', [])
+      or body[:2] == '\037\213'):
+        response.feed_body(body)
+        response.body_done(True)
+    else:
+        # The body isn't available as it was on the wire (HAR usually holds
+        # the decoded content), so we can't check its length, MD5, etc.
+        response.complete = True
+    return request, response
+
+
+def red_messages(notes, lang="en"):
+    "Format notes for a HAR entry's _red_messages."
+    return [{
+        "subject": note.subject,
+        "category": note.category,
+        "level": note.level,
+        "summary": note.show_summary(lang),
+        "subrequests": [],
+    } for note in notes]
+
+
+def check_entry(entry):
+    """
+    Check a HAR entry, returning it with _red_messages added. Suitable for
+    use in a worker process.
+    """
+    try:
+        request, response = entry_to_messages(entry)
+    except (KeyError, AttributeError, TypeError, ValueError), why:
+        entry['_red_error'] = str(why)
+        return entry
+    entry['_red_messages'] = red_messages(response.notes)
+    return entry
+
+
+def annotate(fd, output, processes=None, chunksize=CHUNKSIZE):
+    """
+    Read a HAR document from fd, and write it to the callable output with
+    each entry annotated with RED's notes.
+
+    Entries are checked over a pool of processes (see redbot.lint.pool_map)
+    and written as they're available.
+    """
+    reader = iter(HarReader(fd))
+    members = []  # log members to write after the entries
+    state = {'started': False, 'first': True}
+
+    def member(name, value):
+        "Write a member of the log object."
+        output('%s\n%s: %s' % (
+            "" if state['first'] else ",",
+            json.dumps(name),
+            json.dumps(value)
+        ))
+        state['first'] = False
+
+    def entries():
+        "Generate entries, writing out the log members that precede them."
+        for name, value in reader:
+            if name != u"entry":
+                if state['started']:
+                    members.append((name, value))
+                else:
+                    member(name, value)
+                continue
+            if not state['started']:
+                output('%s\n"entries": [\n' % (
+                    "" if state['first'] else ","))
+                state['started'] = True
+                state['first'] = True
+            yield value
+
+    output('{"log": {')
+    for entry in pool_map(check_entry, entries(), processes, chunksize):
+        output("%s%s" % ("" if state['first'] else ",\n", json.dumps(entry)))
+        state['first'] = False
+    if state['started']:
+        output('\n]')
+        state['first'] = False
+    else:
+        member("entries", []) # it's required, even if there aren't any
+    for name, value in members:
+        member(name, value)
+    output('\n}}\n')
+
+
+class HarReaderTest(unittest.TestCase):
+    har = u"""{"log": {"version": "1.2", "pages": [{"id": "page1"}],
+        "entries": [ {"a": 1} , {"b": [1, 2, "x\\\\"]}, {"c": 12345}],
+        "comment": "\u00e9"}}"""
+
+    def test_reader(self):
+        for read_size in [1, 2, 3, 7, 1024]:
+            reader = HarReader(StringIO(self.har), read_size)
+            self.assertEqual(list(reader), [
+                (u"version", u"1.2"),
+                (u"pages", [{u"id": u"page1"}]),
+                (u"entry", {u"a": 1}),
+                (u"entry", {u"b": [1, 2, u"x\\"]}),
+                (u"entry", {u"c": 12345}),
+                (u"comment", u"\u00e9"),
+            ])
+
+    def test_split_chars(self):
+        har = u'{"log": {"comment": "%s"}}' % (u"\u00e9" * 20)
+        for read_size in [1, 2, 3, 7]:
+            reader = HarReader(StringIO(har.encode('utf-8')), read_size)
+            self.assertEqual(list(reader), [(u"comment", u"\u00e9" * 20)])
+
+    def test_bad(self):
+        reader = HarReader(StringIO(u'{"log": {"entries": [{"a": 1}'))
+        self.assertRaises(HarError, list, reader)
+        reader = HarReader(StringIO('{"log": {"comment": "\xc3'), 1)
+        self.assertRaises(HarError, list, reader)
+
+    def test_isodate(self):
+        self.assertEqual(parse_isodate("2013-03-30T10:00:00Z"), 1364637600)
+        self.assertEqual(parse_isodate("2013-03-30T12:00:00.5+02:00"),
+                         1364637600.5)
+        self.assertRaises(ValueError, parse_isodate, "yesterday")
+
+
+class HarIngestTest(unittest.TestCase):
+    entry = {
+        "startedDateTime": "1994-11-06T08:49:37Z",
+        "request": {
+            "method": "GET",
+            "url": "http://www.example.com/",
+            "httpVersion": "HTTP/1.1",
+            "headers": [],
+        },
+        "response": {
+            "status": 200,
+            "statusText": "OK",
+            "httpVersion": "HTTP/1.1",
+            "headers": [
+                {"name": "Date", "value": "Sun, 06 Nov 1994 08:49:37 GMT"},
+                {"name": "Content-Length", "value": "5"},
+            ],
+            "content": {"size": 4, "text": "abcd", "mimeType": "text/plain"},
+        },
+    }
+
+    def test_entry(self):
+        request, response = entry_to_messages(self.entry)
+        self.assertEqual(request.uri, "http://www.example.com/")
+        self.assertEqual(response.status_code, u"200")
+        self.assertEqual(response.payload_len, 4)
+        self.assertTrue(rs.CL_INCORRECT in
+                        [n.__class__ for n in response.notes])
+
+    def test_annotate(self):
+        har = json.dumps({"log": {"version": "1.2", "entries": [self.entry]}})
+        out = []
+        annotate(StringIO(har), out.append, processes=1)
+        result = json.loads("".join(out))
+        self.assertEqual(result['log']['version'], "1.2")
+        messages = result['log']['entries'][0]['_red_messages']
+        self.assertTrue("header-content-length" in
+                        [m['subject'] for m in messages])
+
+    def test_annotate_empty(self):
+        har = json.dumps({"log": {"version": "1.2", "entries": []}})
+        out = []
+        annotate(StringIO(har), out.append, processes=1)
+        result = json.loads("".join(out))
+        self.assertEqual(result['log'], {"version": "1.2", "entries": []})
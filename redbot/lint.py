@@ -0,0 +1,276 @@
+#!/usr/bin/env python
+
+"""
+Offline header linting.
+
+Runs RED's passive checks (header parsing, status code and caching checks)
+over raw HTTP/1.x header blocks, without touching the network. This makes it
+possible to analyse logged responses in bulk; see bin/redbot-lint for a
+command-line interface.
+
+A header block is the text of a status line (or request line) followed by
+header lines, as they'd appear on the wire. Blocks are separated by one or
+more blank lines. A request block immediately preceding a response block is
+used as the request for that response.
+"""
+
+__author__ = "Mark Nottingham <mnot@mnot.net>"
+__copyright__ = """\
+Copyright (c) 2008-2013 Mark Nottingham
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+"""
+
+from collections import deque
+from itertools import islice
+from multiprocessing import Pool
+import re
+import time
+import unittest
+
+from redbot.message import HttpRequest, HttpResponse
+from redbot.message.headers import parse_date
+from redbot.message.status import StatusChecker
+from redbot.message.cache import checkCaching
+from redbot.speak import Notes, compact_notes
+
+### configuration
+CHUNKSIZE = 64  # records handed to a worker process at a time
+
+STATUS_LINE = re.compile(r"^HTTP/(\d+\.\d+)\s+(\S+)\s*(.*)$")
+REQUEST_LINE = re.compile(r"^(\S+)\s+(\S+)\s+HTTP/(\d+\.\d+)$")
+
+
+def passive_checks(response, request=None):
+    """
+    Run the checks that only need a message (as opposed to the network)
+    against response, using request if available. Headers are expected to
+    have already been set on both.
+    """
+    StatusChecker(response, request)
+    checkCaching(response, request)
+
+
+def split_blocks(lines):
+    """
+    Given an iterable of lines, generate (request_block, response_block)
+    tuples, where each block is a list of lines. request_block is None if
+    the response wasn't preceded by a request.
+    """
+    request_block = None
+    block = []
+    for line in lines:
+        line = line.rstrip("\r\n")
+        if line.strip():
+            block.append(line)
+            continue
+        if block:
+            if REQUEST_LINE.match(block[0]):
+                request_block = block
+            else:
+                yield request_block, block
+                request_block = None
+            block = []
+    if block and not REQUEST_LINE.match(block[0]):
+        yield request_block, block
+
+
+def parse_header_lines(lines):
+    """
+    Parse header lines into a list of (name, value) tuples, unfolding any
+    continuation lines.
+    """
+    headers = []
+    for line in lines:
+        if line[:1] in [" ", "\t"] and headers:
+            name, value = headers[-1]
+            headers[-1] = (name, "%s %s" % (value, line.strip()))
+            continue
+        try:
+            name, value = line.split(":", 1)
+        except ValueError:
+            continue  # not a header line; ignore it like a lenient parser
+        headers.append((name, value.strip()))
+    return headers
+
+
+def parse_block(response_block, request_block=None):
+    """
+    Turn a response block (and optionally, a request block) into
+    HttpResponse and HttpRequest objects, and run the passive checks on
+    them. Returns (response, request); request may be None.
+
+    Raises ValueError if the response block doesn't start with a status line.
+    """
+    match = STATUS_LINE.match(response_block[0])
+    if not match:
+        raise ValueError, "Not a status line: %r" % response_block[0][:40]
+    notes = Notes()
+    request = None
+    if request_block:
+        method, uri, version = REQUEST_LINE.match(request_block[0]).groups()
+        req_hdrs = parse_header_lines(request_block[1:])
+        host = [v for (n, v) in req_hdrs if n.strip().lower() == 'host']
+        if uri[:1] == "/" and host:
+            uri = "http://%s%s" % (host[-1], uri)  # origin-form
+        request = HttpRequest(notes)
+        request.method = method
+        request.version = version
+        request.set_iri(uri.decode('iso-8859-1', 'replace'))
+        request.set_headers(req_hdrs)
+    response = HttpResponse(notes)
+    version, status, phrase = match.groups()
+    response.version = version
+    response.status_code = status.decode('iso-8859-1', 'replace')
+    response.status_phrase = phrase.decode('iso-8859-1', 'replace')
+    response.base_uri = getattr(request, 'uri', None) or ""
+    res_hdrs = parse_header_lines(response_block[1:])
+    response.start_time = _received_time(res_hdrs)
+    response.set_headers(res_hdrs)
+    passive_checks(response, request)
+    return response, request
+
+
+def _received_time(headers):
+    """
+    Logged responses don't record when they were received, so use the
+    Date header if it's usable (avoiding spurious clock skew notes), or
+    the current time if not.
+    """
+    for name, value in headers:
+        if name.strip().lower() == 'date':
+            try:
+                return parse_date(value.strip())
+            except ValueError:
+                break
+    return time.time()
+
+
+def check_record(record):
+    """
+    Check a single (index, request_block, response_block) record. Returns
+    a dictionary describing the result; suitable for use in a worker process.
+    """
+    index, request_block, response_block = record
+    try:
+        response, request = parse_block(response_block, request_block)
+    except ValueError, why:
+        return {'record': index, 'error': str(why)}
+    return {
+        'record': index,
+        'status': response.status_code,
+        'notes': compact_notes(response.notes),
+    }
+
+
+def lint(blocks, processes=None, chunksize=CHUNKSIZE):
+    """
+    Check an iterable of (request_block, response_block) tuples (e.g., from
+    split_blocks()), generating a result (see check_record) for each, in
+    order.
+
+    Checks are run over a pool of processes; if processes is 1, they're run
+    in this process.
+    """
+    records = ((i, req, res) for i, (req, res) in enumerate(blocks, 1))
+    return pool_map(check_record, records, processes, chunksize)
+
+
+def pool_map(func, items, processes=None, chunksize=CHUNKSIZE):
+    """
+    Like Pool.imap, but only keeps a few chunks per process in flight, so
+    that a huge (or endless) iterable of items isn't read into memory all
+    at once. func must be a module-level function. Results are generated
+    in order.
+
+    If processes is 1, func is run in this process.
+    """
+    if processes == 1:
+        for item in items:
+            yield func(item)
+        return
+    items = iter(items)
+    pool = Pool(processes)
+    window = 2 * getattr(pool, '_processes', 1)
+    pending = deque()
+    try:
+        while True:
+            chunk = list(islice(items, chunksize))
+            if chunk:
+                pending.append(pool.apply_async(_map_chunk, (func, chunk)))
+            while pending and (len(pending) >= window or not chunk):
+                for result in pending.popleft().get():
+                    yield result
+            if not chunk:
+                break
+        pool.close()
+    finally:
+        pool.terminate()
+        pool.join()
+
+
+def _map_chunk(func, chunk):
+    "Apply func to a chunk of items in a worker process."
+    return [func(item) for item in chunk]
+
+
+class LintTest(unittest.TestCase):
+    block = """\
+HTTP/1.1 200 OK
+Date: Sun, 06 Nov 1994 08:49:37 GMT
+Cache-Control: max-age=60,
+  public
+Content-Type: text/html
+
+GET /foo HTTP/1.1
+Host: www.example.com
+
+HTTP/1.1 301 Moved Permanently
+Date: Sun, 06 Nov 1994 08:49:37 GMT
+Location: /bar
+""".splitlines(True)
+
+    def test_split_blocks(self):
+        blocks = list(split_blocks(self.block))
+        self.assertEqual(len(blocks), 2)
+        self.assertEqual(blocks[0][0], None)
+        self.assertEqual(blocks[0][1][3], "  public")
+        self.assertEqual(blocks[1][0][0], "GET /foo HTTP/1.1")
+
+    def test_parse_block(self):
+        blocks = list(split_blocks(self.block))
+        response, request = parse_block(blocks[0][1])
+        self.assertEqual(request, None)
+        self.assertEqual(response.status_code, u"200")
+        self.assertEqual(response.parsed_headers['cache-control'],
+                         set([('max-age', 60), ('public', None)]))
+        self.assertEqual(response.freshness_lifetime, 60)
+        response, request = parse_block(blocks[1][1], blocks[1][0])
+        self.assertEqual(request.uri, "http://www.example.com/foo")
+        self.assertEqual(response.base_uri, request.uri)
+
+    def test_lint(self):
+        results = list(lint(split_blocks(self.block), processes=1))
+        self.assertEqual([r['record'] for r in results], [1, 2])
+        self.assertTrue('DATE_CORRECT' in
+                        [n[0] for n in results[0]['notes']])
+        self.assertFalse('URI_BAD_SYNTAX' in
+                         [n[0] for n in results[1]['notes']])
+        bad = list(lint([(None, ["foo"])], processes=1))
+        self.assertTrue(bad[0].has_key('error'))
@@ -28,14 +28,17 @@ THE SOFTWARE.
 """
 
 import base64
+from collections import deque
 import hashlib
 import re
 import time
+import unittest
 import urllib
 import urlparse
 import zlib
 
 from redbot.message import link_parse
+from redbot.message.charset import TextDecoder
 from redbot.message.headers import process_headers
 from redbot.formatter import f_num
 import redbot.speak as rs
@@ -45,6 +48,11 @@ import thor.http.error as httperr
 
 ### configuration
 MAX_URI = 8000
+URI_MEMO_SIZE = 1024 # number of IRIs to remember the conversion of
+
+_uri_memo = {} # iri -> (uri, valid)
+_uri_memo_order = deque() # iris in _uri_memo, oldest first
+_uri_syntax = [] # the compiled URI grammar, once it's needed
 
 class HttpMessage(object):
     """
@@ -69,11 +77,14 @@ class HttpMessage(object):
         self.decoded_md5 = None
         self._decoded_procs = []
         self._decode_ok = True # turn False if we have a problem
+        self._text_decoder = None
+        self._link_procs = []
+        self._link_parser_name = None
         self._link_parser = None
         self.transfer_length = 0
         self.trailers = []
         self.http_error = None  # any parse errors encountered; see httperr
-        self._context = {}
+        self._context = ()
         self._md5_processor = hashlib.new('md5')
         self._md5_post_processor = hashlib.new('md5')
         self._gzip_processor = zlib.decompressobj(-zlib.MAX_WBITS)
@@ -81,7 +92,7 @@ class HttpMessage(object):
         self._gzip_header_buffer = ""
         self.name = name
         if notes is None:
-            self.notes = []
+            self.notes = rs.Notes()
         else:
             self.notes = notes
 
@@ -96,6 +107,8 @@ class HttpMessage(object):
             '_md5_processor', 
             '_md5_post_processor',
             '_gzip_processor',
+            '_text_decoder',
+            '_link_procs',
             '_link_parser'
         ]:
             if state.has_key(key):
@@ -103,13 +116,22 @@ class HttpMessage(object):
         return state
 
     def set_decoded_procs(self, decoded_procs):
-        "Set a list of processors for the decoded body."
+        """
+        Set a list of processors for the decoded body. Each is called with
+        the message and a chunk of the body as unicode, decoded from its
+        content-codings and character encoding.
+        """
         self._decoded_procs = decoded_procs
 
-    def set_link_procs(self, link_procs):
-        "Set a list of link processors that get called upon each link."
-        self._link_parser = link_parse.HTMLLinkParser(
-            self.base_uri, link_procs)
+    def set_link_procs(self, link_procs, link_parser=None):
+        """
+        Set a list of link processors that get called upon each link.
+        link_parser is the name of the link parser to use for HTML; see
+        link_parse.LINK_PARSERS. Other media types (e.g., CSS) have their
+        own parsers, so the parser is chosen when the body starts.
+        """
+        self._link_procs = link_procs
+        self._link_parser_name = link_parser
         
     def set_headers(self, headers):
         """
@@ -138,14 +160,42 @@ class HttpMessage(object):
             self.payload += chunk
         else:
             decoded_chunk = self._process_content_codings(chunk)
-            if self._decode_ok:
+            if self._link_procs and self._link_parser is None:
+                media_type = self.parsed_headers.get(
+                    'content-type', [None])[0]
+                parser_class = link_parse.get_link_parser(
+                    media_type, self._link_parser_name
+                )
+                if media_type in parser_class.link_parseable_types:
+                    self._link_parser = parser_class(
+                        self.base_uri, self._link_procs
+                    )
+                else:
+                    self._link_parser = False # don't decode just for links
+            if self._decode_ok and (self._decoded_procs or self._link_parser):
+                text = self._decode_text(decoded_chunk)
                 for processor in self._decoded_procs:
                     # TODO: figure out why raising an error in a body_proc
                     # results in a "server dropped the connection" instead of
                     # a hard error.
-                    processor(self, decoded_chunk)
+                    processor(self, text)
                 if self._link_parser:
-                    self._link_parser.feed(self, decoded_chunk)
+                    self._link_parser.feed(self, text)
+                    if self._link_parser.doc_enc:
+                        # e.g., from <meta>; use it for the rest of the body
+                        self._text_decoder.set_encoding(
+                            self._link_parser.doc_enc
+                        )
+
+    def _decode_text(self, chunk):
+        """
+        Decode a chunk of the (content-decoded) body into unicode. The same
+        decoder is used for the whole body, so that characters split between
+        chunks survive.
+        """
+        if self._text_decoder is None:
+            self._text_decoder = TextDecoder(self.character_encoding)
+        return self._text_decoder.decode(chunk)
         
     def body_done(self, complete, trailers=None):
         """
@@ -274,15 +324,13 @@ class HttpMessage(object):
 
     def set_context(self, **kw):
         "Set the note context."
-        self._context = kw
+        self._context = tuple(kw.items())
         
     def add_note(self, subject, note, subreq=None, **kw):
         "Set a note."
-        kw.update(self._context)
-        kw['response'] = rs.response.get(
-            self.name, rs.response['this']
-        )['en']
-        self.notes.append(note(subject, subreq, kw))
+        self.notes.add(
+            note, subject, subreq, self.name, tuple(kw.items()) + self._context
+        )
         
         
 class HttpRequest(HttpMessage):
@@ -300,20 +348,20 @@ class HttpRequest(HttpMessage):
         Given an IRI or URI, convert to a URI and make sure it's sensible.
         """
         try:
-            self.uri = self.iri_to_uri(iri)
+            self.uri, valid = check_iri(iri)
         except (ValueError, UnicodeError), why:
             self.http_error = httperr.UrlError(why[0])
             return
-        if not re.match("^\s*%s\s*$" % URI, self.uri, re.VERBOSE):
-            self.add_note('uri', rs.URI_BAD_SYNTAX)
-        if '#' in self.uri:
-            # chop off the fragment
-            self.uri = self.uri[:self.uri.index('#')]
-        if len(self.uri) > MAX_URI:
+        if valid is None:
             self.add_note('uri',
                 rs.URI_TOO_LONG,
                 uri_len=f_num(len(self.uri))
             )
+        elif not valid:
+            self.add_note('uri', rs.URI_BAD_SYNTAX)
+        if '#' in self.uri:
+            # chop off the fragment
+            self.uri = self.uri[:self.uri.index('#')]
 
     @staticmethod
     def iri_to_uri(iri):
@@ -341,6 +389,34 @@ class HttpRequest(HttpMessage):
         )
         return urlparse.urlunsplit((scheme, authority, path, query, frag))
 
+
+def check_iri(iri):
+    """
+    Convert iri to a URI and check its syntax, returning (uri, valid).
+    valid is None if the URI is too long to check.
+
+    The same URIs get checked over and over (e.g., by each subrequest), so
+    the results for the last URI_MEMO_SIZE IRIs are remembered.
+
+    Raises ValueError or UnicodeError if iri can't be converted.
+    """
+    try:
+        return _uri_memo[iri]
+    except KeyError:
+        pass
+    uri = HttpRequest.iri_to_uri(iri)
+    if len(uri) > MAX_URI:
+        # don't spend time matching (or memory remembering) huge ones
+        return uri, None
+    if not _uri_syntax:
+        _uri_syntax.append(re.compile(r"^\s*%s\s*$" % URI, re.VERBOSE))
+    result = (uri, _uri_syntax[0].match(uri) is not None)
+    if len(_uri_memo) >= URI_MEMO_SIZE:
+        del _uri_memo[_uri_memo_order.popleft()]
+    _uri_memo[iri] = result
+    _uri_memo_order.append(iri)
+    return result
+
         
 class HttpResponse(HttpMessage):
     """
@@ -377,3 +453,45 @@ class DummyMsg(HttpResponse):
     def set_context(self, **kw):
         "Don't need context for testing."
         pass
+
+
+class FeedBodyTest(unittest.TestCase):
+    def feed(self, media_type, body):
+        links = []
+        response = HttpResponse()
+        response.status_code = "200"
+        response.set_headers([("Content-Type", media_type)])
+        response.set_link_procs([lambda *args: links.append(args[1])])
+        response.feed_body(body)
+        return response, links
+
+    def test_html(self):
+        response, links = self.feed("text/html", "<a href='/a'>a</a>")
+        self.assertEqual(links, [u"/a"])
+        self.assertNotEqual(response._text_decoder, None)
+
+    def test_binary(self):
+        response, links = self.feed("image/png", "\x89PNG<a href='/a'>")
+        self.assertEqual(links, [])
+        self.assertEqual(response._text_decoder, None)
+
+
+class CheckIriTest(unittest.TestCase):
+    def setUp(self):
+        _uri_memo.clear()
+        _uri_memo_order.clear()
+
+    def test_check_iri(self):
+        self.assertEqual(check_iri(u"http://www.example.com/a b"),
+                         ("http://www.example.com/a%20b", True))
+        self.assertEqual(check_iri(u"http://www.example.com/a b"),
+                         ("http://www.example.com/a%20b", True))
+        self.assertEqual(check_iri(u"http://www.example.com:a/")[1], False)
+        self.assertEqual(check_iri(u"http://a/" + u"b" * MAX_URI)[1], None)
+        self.assertRaises(UnicodeError, check_iri, u"http://a..b/")
+
+    def test_memo_size(self):
+        for i in range(URI_MEMO_SIZE + 1):
+            check_iri(u"http://www.example.com/%s" % i)
+        self.assertEqual(len(_uri_memo), URI_MEMO_SIZE)
+        self.assertFalse(u"http://www.example.com/0" in _uri_memo)
@@ -0,0 +1,124 @@
+#!/usr/bin/env python
+
+"""
+Incremental decoding of message bodies into text.
+"""
+
+__author__ = "Mark Nottingham <mnot@mnot.net>"
+__copyright__ = """\
+Copyright (c) 2008-2013 Mark Nottingham
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+"""
+
+import codecs
+import unittest
+
+
+class TextDecoder(object):
+    """
+    Decode a stream of bytes into unicode a chunk at a time, so that
+    characters split across chunks aren't lost.
+
+    The encoding can be changed part of the way through (e.g., when a <meta>
+    element declares it); bytes that the old decoder was waiting on are
+    handed to the new one. Unknown (or non-text) encodings are ignored, apart
+    from the initial one, which falls back to default_encoding.
+    """
+    default_encoding = 'utf-8'
+
+    def __init__(self, encoding=None, errors='ignore'):
+        self.errors = errors
+        self.encoding = None
+        self._decoder = None
+        self._pending = ""
+        if not self.set_encoding(encoding or self.default_encoding):
+            self.set_encoding(self.default_encoding)
+
+    def set_encoding(self, encoding):
+        """
+        Use encoding to decode from now on. Returns True if the encoding is
+        usable.
+        """
+        try:
+            codec = codecs.lookup(encoding)
+        except (LookupError, TypeError, ValueError):
+            return False
+        if codec.name == self.encoding:
+            return True
+        if codec.incrementaldecoder is None:
+            return False
+        try:
+            decoder = codec.incrementaldecoder(self.errors)
+            if not isinstance(decoder.decode(""), unicode):
+                return False # e.g., zlib
+        except Exception:
+            return False
+        if self._decoder is not None:
+            self._pending += self._decoder.getstate()[0]
+        self._decoder = decoder
+        self.encoding = codec.name
+        return True
+
+    def decode(self, chunk, final=False):
+        "Decode a chunk of bytes, returning unicode."
+        if self._pending:
+            chunk = self._pending + chunk
+            self._pending = ""
+        return self._decoder.decode(chunk, final)
+
+
+class TextDecoderTest(unittest.TestCase):
+    def test_split(self):
+        decoder = TextDecoder('utf-8')
+        body = u"caf\xe9 \u2603".encode('utf-8')
+        out = u"".join([decoder.decode(c) for c in body])
+        self.assertEqual(out, u"caf\xe9 \u2603")
+
+    def test_switch(self):
+        decoder = TextDecoder('iso-8859-1')
+        self.assertEqual(decoder.decode("a\xe9"), u"a\xe9")
+        self.assertTrue(decoder.set_encoding('UTF8'))
+        self.assertEqual(decoder.encoding, 'utf-8')
+        self.assertEqual(decoder.decode("\xe2\x98"), u"")
+        self.assertTrue(decoder.set_encoding('utf-16-be'))
+        self.assertTrue(decoder.set_encoding('utf-8'))
+        self.assertEqual(decoder.decode("\x83"), u"\u2603")
+
+    def test_bad_encoding(self):
+        decoder = TextDecoder('foo')
+        self.assertEqual(decoder.encoding, 'utf-8')
+        self.assertFalse(decoder.set_encoding('zlib'))
+        self.assertFalse(decoder.set_encoding(None))
+        self.assertEqual(decoder.encoding, 'utf-8')
+
+    def test_message(self):
+        from redbot.message import DummyMsg
+        msg = DummyMsg()
+        msg.set_headers([("Content-Type", "text/html; charset=iso-8859-1")])
+        text = []
+        links = []
+        msg.set_decoded_procs([lambda m, chunk: text.append(chunk)])
+        msg.set_link_procs([lambda base, link, tag, title: links.append(link)])
+        for chunk in ['<meta http-equiv="Content-Type" ',
+                      'content="text/html; charset=utf-8">\n',
+                      '<a href="/caf\xc3', '\xa9">\xc3', '\xa9</a>']:
+            msg.feed_body(chunk)
+        self.assertEqual(links, [u"/caf\xe9"])
+        self.assertTrue(u"".join(text).endswith(u"\xe9</a>"))
@@ -0,0 +1,296 @@
+#!/usr/bin/env python
+
+"""
+Performance checks for the header handlers.
+
+Discovers every module in redbot.message.headers, and times its parse and
+join functions (via process_headers) against realistic inputs (taken from
+the module's HeaderTest cases) and adversarial ones, at increasing sizes.
+
+A case is flagged if:
+  - it takes more than CALL_BUDGET seconds to process one field, since header
+    processing runs on the shared event loop,
+  - its time grows faster than its input (i.e., it goes superlinear), or
+  - it's more than BASELINE_SLACK times slower than a stored baseline.
+
+Run as a script to see a report; see --help.
+"""
+
+__author__ = "Mark Nottingham <mnot@mnot.net>"
+__copyright__ = """\
+Copyright (c) 2008-2013 Mark Nottingham
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+"""
+
+import json
+import math
+import pkgutil
+import sys
+from timeit import default_timer as timer
+import unittest
+
+from redbot.message import DummyMsg
+from redbot.message import headers as rh
+
+### configuration
+MIN_SIZE = 16         # smallest adversarial input, in characters or members
+MAX_SIZE = 8 * 1024   # largest adversarial input
+SIZE_STEP = 4         # factor between input sizes
+CALL_BUDGET = 0.05    # seconds that one field may take to process
+MIN_TIME = 0.001      # ignore timings smaller than this when comparing
+SUPERLINEAR = 1.5     # growth exponent above which a case is flagged
+BASELINE_SLACK = 2.0  # how much slower than the baseline a case may be
+REPEAT = 3            # number of timings to take the best of
+
+
+# Adversarial input generators. Each takes a size and returns a header
+# field-value.
+ADVERSARIAL = {
+    'token': lambda n: "a" * n,
+    'quoted': lambda n: '"%s"' % ("a" * n),
+    'quoted-escapes': lambda n: '"%s' % ("\\\"" * n),  # unterminated
+    'param': lambda n: 'a="%s' % ("b" * n),  # unterminated
+    'list': lambda n: ", ".join(["a=b"] * n),
+    'list-empty': lambda n: "," * n,
+    'space': lambda n: "a%sb" % (" " * n),
+    'space-quote': lambda n: 'a%s"b' % (" " * n),
+    'comment': lambda n: "a/1 (%s" % ("(b)" * n),  # unterminated
+    'comment-nested': lambda n: "a/1 %s%s" % ("(" * n, ")" * (n - 1)),
+    'uri': lambda n: "http://%s/%s" % ("a" * n, "b%" * n),
+    'date': lambda n: "Sun, 06 Nov 1994 08:49:37 %s" % ("0" * n),
+}
+
+
+def header_modules():
+    """
+    Generate (field_name, module) for each header handler module.
+    """
+    for _, name, ispkg in pkgutil.iter_modules(rh.__path__):
+        if ispkg or name.startswith("_"):
+            continue
+        module_name = "redbot.message.headers.%s" % name
+        __import__(module_name)
+        module = sys.modules[module_name]
+        if hasattr(module, 'parse') and hasattr(module, 'join'):
+            yield name.replace("_", "-"), module
+
+
+def realistic_inputs(module):
+    """
+    Return a list of field-values lists, taken from the HeaderTest cases in
+    module.
+    """
+    inputs = []
+    for obj in vars(module).values():
+        if isinstance(obj, type) and issubclass(obj, rh.HeaderTest) \
+          and obj.inputs:
+            inputs.append(list(obj.inputs))
+    return inputs
+
+
+def time_values(field_name, values, repeat=REPEAT):
+    """
+    Return the best time, in seconds, that it takes to process the given
+    list of field-values for field_name.
+    """
+    best = None
+    for _ in range(repeat):
+        msg = DummyMsg()
+        msg.headers = [(field_name, value) for value in values]
+        start = timer()
+        rh.process_headers(msg)
+        elapsed = timer() - start
+        if best is None or elapsed < best:
+            best = elapsed
+    return best
+
+
+def growth(timings):
+    """
+    Given a list of (size, seconds), return the largest exponent k such that
+    time grows like size ** k between two consecutive sizes, ignoring timings
+    too small to be meaningful. Returns None if there isn't enough data.
+    """
+    worst = None
+    for (size1, time1), (size2, time2) in zip(timings, timings[1:]):
+        if time2 < MIN_TIME:
+            continue
+        k = math.log(time2 / max(time1, 1e-9)) / math.log(float(size2) / size1)
+        if worst is None or k > worst:
+            worst = k
+    return worst
+
+
+def bench_module(field_name, module, max_size=MAX_SIZE, repeat=REPEAT):
+    """
+    Benchmark the header handler module for field_name. Returns a dictionary
+    of case name to result, where a result is a dictionary with:
+      - 'timings': a list of (size, seconds)
+      - 'growth': the growth exponent (see growth()), or None
+      - 'error': the exception raised while processing, if any
+    """
+    results = {}
+    try:
+        time_values(field_name, ["a"], 1)  # warm up (e.g., compile regexen)
+    except Exception:
+        pass
+    for i, values in enumerate(realistic_inputs(module)):
+        result = {'timings': [], 'growth': None, 'error': None}
+        try:
+            result['timings'].append(
+                (len(values), time_values(field_name, values, repeat))
+            )
+        except Exception, why:
+            result['error'] = "%s: %s" % (why.__class__.__name__, why)
+        results["realistic-%s" % i] = result
+    for case, generate in sorted(ADVERSARIAL.items()):
+        timings = []
+        error = None
+        size = MIN_SIZE
+        while size <= max_size:
+            try:
+                seconds = time_values(field_name, [generate(size)], repeat)
+            except Exception, why:
+                error = "%s: %s" % (why.__class__.__name__, why)
+                break
+            timings.append((size, seconds))
+            if seconds > CALL_BUDGET:
+                break  # don't keep going if it's already too slow
+            size *= SIZE_STEP
+        results[case] = {
+            'timings': timings,
+            'growth': growth(timings),
+            'error': error,
+        }
+    return results
+
+
+def check(field_name, results, baseline=None):
+    """
+    Return a list of problems (as strings) with the results for field_name,
+    compared against baseline (see summarise()) if given.
+    """
+    problems = []
+    for case, result in sorted(results.items()):
+        if result['error']:
+            problems.append("%s %s: %s" % (field_name, case, result['error']))
+        if not result['timings']:
+            continue
+        size, seconds = result['timings'][-1]
+        if seconds > CALL_BUDGET:
+            problems.append("%s %s: %.3fs for size %s" % (
+                field_name, case, seconds, size))
+        if result['growth'] is not None and result['growth'] > SUPERLINEAR:
+            problems.append("%s %s: superlinear (size ** %.1f)" % (
+                field_name, case, result['growth']))
+        if baseline:
+            previous = baseline.get("%s %s" % (field_name, case), None)
+            if not previous:
+                continue
+            size, previous = previous
+            seconds = dict(result['timings']).get(size, 0)
+            if seconds > MIN_TIME and seconds > previous * BASELINE_SLACK:
+                problems.append("%s %s: %.4fs for size %s, baseline %.4fs" % (
+                    field_name, case, seconds, size, previous))
+    return problems
+
+
+def summarise(field_name, results):
+    """
+    Return a dictionary suitable for storing as a baseline; its keys are
+    "field-name case" and its values are [size, seconds] for the largest
+    size timed.
+    """
+    return dict([("%s %s" % (field_name, case), list(result['timings'][-1]))
+                 for case, result in results.items() if result['timings']])
+
+
+def main():
+    from optparse import OptionParser
+    usage = "Usage: %prog [options] [field-name ...]"
+    opt_parser = OptionParser(usage=usage)
+    opt_parser.set_defaults(max_size=MAX_SIZE, repeat=REPEAT)
+    opt_parser.add_option(
+        "-b", "--baseline", dest="baseline",
+        help="compare against the baseline in this file"
+    )
+    opt_parser.add_option(
+        "-s", "--save", dest="save",
+        help="save the results as a baseline to this file"
+    )
+    opt_parser.add_option(
+        "-m", "--max-size", type="int", dest="max_size",
+        help="largest adversarial input size (default %s)" % MAX_SIZE
+    )
+    opt_parser.add_option(
+        "-r", "--repeat", type="int", dest="repeat",
+        help="timings to take the best of (default %s)" % REPEAT
+    )
+    (options, args) = opt_parser.parse_args()
+    wanted = set([a.lower() for a in args])
+
+    baseline = None
+    if options.baseline:
+        baseline = json.load(open(options.baseline))
+    problems = []
+    summary = {}
+    for field_name, module in header_modules():
+        if wanted and field_name not in wanted:
+            continue
+        results = bench_module(
+            field_name, module, options.max_size, options.repeat
+        )
+        summary.update(summarise(field_name, results))
+        found = check(field_name, results, baseline)
+        for problem in found:
+            print problem
+        problems.extend(found)
+    if options.save:
+        fd = open(options.save, 'w')
+        json.dump(summary, fd, indent=1, sort_keys=True)
+        fd.close()
+    if problems:
+        sys.exit(1)
+
+
+class HeaderBenchTest(unittest.TestCase):
+    def test_discovery(self):
+        names = [name for (name, module) in header_modules()]
+        self.assertTrue('cache-control' in names)
+        self.assertTrue('x-xss-protection' in names)
+
+    def test_growth(self):
+        self.assertEqual(growth([(1, 0.0001), (4, 0.0002)]), None)
+        self.assertAlmostEqual(growth([(1, 0.01), (4, 0.04)]), 1.0)
+        self.assertAlmostEqual(growth([(1, 0.01), (2, 0.04)]), 2.0)
+
+    def test_check(self):
+        module = dict(header_modules())['age']
+        results = bench_module('age', module, max_size=MIN_SIZE, repeat=1)
+        self.assertTrue('realistic-0' in results)
+        self.assertTrue('list' in results)
+        slow = {'age list': [16, MIN_TIME / 10]}
+        self.assertEqual(check('age', results), [])
+        results['list']['timings'] = [(16, CALL_BUDGET * 2)]
+        self.assertEqual(len(check('age', results, slow)), 2)
+
+
+if "__main__" == __name__:
+    main()
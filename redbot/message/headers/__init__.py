@@ -33,6 +33,7 @@ import calendar
 from email.utils import parsedate as lib_parsedate
 import re
 import sys
+from time import clock
 import unittest
 import urllib
 
@@ -49,6 +50,7 @@ rfc6266 = "http://www.apps.ietf.org/rfc/rfc6266.html#section-4"
 ### configuration
 MAX_HDR_SIZE = 4 * 1024
 MAX_TTL_HDR = 8 * 1000
+MAX_PARSE_TIME = 0.05 # CPU seconds to spend parsing a single header field
 
 
 # Decorators for headers
@@ -66,10 +68,7 @@ def GenericHeaderSyntax(func):
       ["foo", "bar", "baz", "bat"]
     """
     assert func.__name__ == 'parse', func.__name__
-    def split_generic_syntax(value): # pylint: disable=C0111
-        return [f.strip() for f in re.findall(r'((?:[^",]|%s)+)(?=%s|\s*$)' %
-             (syntax.QUOTED_STRING, syntax.COMMA), value)] or ['']
-    func.pre_parse = split_generic_syntax
+    func.pre_parse = split_list
     return func
 
 def SingleFieldValue(func):
@@ -125,10 +124,11 @@ def CheckFieldSyntax(exp, ref):
     Decorator for parse; to check each header field-value to conform to the
     regex exp, and if not to point users to url ref.
     """
+    checker = re.compile(r"^\s*(?:%s)\s*$" % exp, re.VERBOSE)
     def wrap(func): # pylint: disable=C0111
         assert func.__name__ == 'parse', func.__name__
         def new(subject, value, msg): # pylint: disable=C0111
-            if not re.match(r"^\s*(?:%s)\s*$" % exp, value, re.VERBOSE):
+            if not checker.match(value):
                 msg.add_note(subject, rs.BAD_SYNTAX, ref_uri=ref)
                 def bad_syntax(subject, value, msg): # pylint: disable=W0613
                     "Don't process headers with bad syntax."
@@ -149,6 +149,10 @@ def process_headers(msg):
     Using msg.headers, it populates:
       - .headers with a Unicode version of the input
       - .parsed_headers with a dictionary of parsed header values
+
+    Parsing each field is limited to MAX_PARSE_TIME seconds of CPU time in
+    total, but the limit is only checked between list members, so a single
+    slow member can't be interrupted.
     """
 
     hdr_dict = {}
@@ -159,6 +163,7 @@ def process_headers(msg):
         header_block_size += len(msg.status_phrase) + 5
     clean_hdrs = []      # unicode version of the header tuples
     parsed_hdrs = {}     # dictionary of parsed header values
+    parse_times = {}     # seconds spent parsing each field
     offset = 0
     for name, value in msg.headers:
         offset += 1
@@ -195,6 +200,12 @@ def process_headers(msg):
         
         hdr_parse = load_header_func(norm_name, 'parse')
         if hdr_parse:
+            # Parsing happens on the event loop, so don't let a pathological
+            # field hog it.
+            parse_time = parse_times.get(norm_name, 0)
+            if parse_time > MAX_PARSE_TIME:
+                continue
+            start = clock()
             if hasattr(hdr_parse, 'pre_parse'):
                 values = hdr_parse.pre_parse(value)
             else:
@@ -205,6 +216,11 @@ def process_headers(msg):
                 parsed_value = hdr_parse(subject, value, msg)
                 if parsed_value != None:
                     hdr_dict[norm_name][1].append(parsed_value)
+                if parse_time + clock() - start > MAX_PARSE_TIME:
+                    msg.add_note(subject, rs.HEADER_TOO_COMPLEX,
+                        header_name=name)
+                    break
+            parse_times[norm_name] = parse_time + clock() - start
         
     # replace the original header tuple with ones that are clean unicode
     msg.headers = clean_hdrs
@@ -279,6 +295,63 @@ def unquote_string(instr):
         instr = re.sub(r'\\(.)', r'\1', ninstr)
     return instr
 
+def split_list(instr):
+    """
+    Split a list-based header field-value on the commas that aren't inside
+    quoted strings. This is done by hand (rather than with a regex) so that
+    it takes linear time whatever the input.
+
+    Like the regex it replaced, members with nothing between their commas
+    are dropped, but members that are only whitespace are kept as '', so
+    that the header's parser notes them as bad syntax.
+
+    If the last quoted string isn't terminated, the last member is split
+    again from just after its first quote, to recover from a stray one.
+
+    E.g.,
+      'foo, "bar, baz",, bat, '
+    becomes
+      ['foo', '"bar, baz"', 'bat', '']
+
+    @param instr: string to be split
+    @return: list of strings; [''] if there are no members
+    """
+    members, unterminated = _scan_list(instr, 0)
+    if unterminated is not None:
+        first_quote = instr.index('"', unterminated)
+        retry, still_unterminated = _scan_list(instr, first_quote + 1)
+        if still_unterminated is None:
+            members = members[:-1] + retry
+    return [m.strip() for m in members if m] or ['']
+
+def _scan_list(instr, start):
+    """
+    Split instr from start on commas outside of quoted strings. Returns
+    (members, unterminated), where unterminated is the offset of the last
+    member if it ends inside a quoted string, or None.
+    """
+    members = []
+    quoted = False
+    i = start
+    length = len(instr)
+    while i < length:
+        char = instr[i]
+        if quoted:
+            if char == '\\':
+                i += 1 # skip the quoted-pair
+            elif char == '"':
+                quoted = False
+        elif char == '"':
+            quoted = True
+        elif char == ',':
+            members.append(instr[start:i])
+            start = i + 1
+        i += 1
+    members.append(instr[start:])
+    if quoted:
+        return members, start
+    return members, None
+
 def split_string(instr, item, split):
     """
     Split instr as a list of items separated by splits.
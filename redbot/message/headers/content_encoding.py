@@ -57,6 +57,18 @@ class ContentEncodingCaseTest(rh.HeaderTest):
     expected_out = ['gzip']
     expected_err = []
 
+class ContentEncodingEmptyMemberTest(rh.HeaderTest):
+    name = 'Content-Encoding'
+    inputs = ['gzip, , gzip']
+    expected_out = ['gzip', 'gzip']
+    expected_err = [rs.BAD_SYNTAX]
+
+class ContentEncodingDoubleCommaTest(rh.HeaderTest):
+    name = 'Content-Encoding'
+    inputs = ['gzip,,gzip']
+    expected_out = ['gzip', 'gzip']
+    expected_err = []
+
 class UnwantedContentEncodingTest(rh.HeaderTest):
     name = 'Content-Encoding'
     inputs = ['gzip', 'foo']
@@ -29,6 +29,7 @@ import redbot.speak as rs
 from redbot.message import headers as rh
 from redbot.message import http_syntax as syntax
 
+URI_REFERENCE = re.compile(r"^\s*%s\s*$" % syntax.URI_reference, re.VERBOSE)
 
 @rh.GenericHeaderSyntax
 @rh.CheckFieldSyntax(
@@ -49,8 +50,7 @@ def parse(subject, value, red):
         red.add_note(subject, rs.LINK_REV,
                         link=link, rev=param_dict['rev'])
     if param_dict.has_key('anchor'): # URI-Reference
-        if not re.match(r"^\s*%s\s*$" % syntax.URI_reference, 
-                        param_dict['anchor'], re.VERBOSE):
+        if not URI_REFERENCE.match(param_dict['anchor']):
             red.add_note(subject, rs.LINK_BAD_ANCHOR,
                             link=link,
                             anchor=param_dict['anchor'])
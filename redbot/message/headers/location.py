@@ -30,6 +30,7 @@ import redbot.speak as rs
 from redbot.message import headers as rh
 from redbot.message import http_syntax as syntax
 
+ABSOLUTE_URI = re.compile(r"^\s*%s\s*$" % syntax.URI, re.VERBOSE)
 
 # The most common problem with Location is a non-absolute URI, 
 # so we separate that from the syntax check.
@@ -40,7 +41,7 @@ def parse(subject, value, msg):
         "201", "300", "301", "302", "303", "305", "307"
     ]:
         msg.add_note(subject, rs.LOCATION_UNDEFINED)
-    if not re.match(r"^\s*%s\s*$" % syntax.URI, value, re.VERBOSE):
+    if not ABSOLUTE_URI.match(value):
         msg.add_note(subject, rs.LOCATION_NOT_ABSOLUTE,
                         full_uri=urljoin(msg.base_uri, value))
     return value
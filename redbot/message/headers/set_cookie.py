@@ -57,9 +57,7 @@ def loose_parse(set_cookie_string, uri_path, current_time, subject, red):
     try:
         name, value = name_value_pair.split("=", 1)
     except ValueError:
-        red.add_note(subject, rs.SET_COOKIE_NO_VAL,
-            name_value_pair.strip()
-        )
+        red.add_note(subject, rs.SET_COOKIE_NO_VAL)
         raise ValueError, "Cookie doesn't have a value"
     name, value = name.strip(), value.strip()
     if name == "":
@@ -2,6 +2,15 @@
 
 """
 Parsing links from streams of data.
+
+There are two link parsers with the same interface; HTMLLinkParser, which is
+based upon the standard library's HTMLParser, and HTMLLinkScanner, which is
+much faster because it only looks closely at the tags that can contain links.
+LINK_PARSERS maps their names to them.
+
+CSSLinkParser finds links in stylesheets; it's also used for the contents of
+style elements and attributes in HTML. MEDIA_TYPE_LINK_PARSERS says which
+parser to use for media types that aren't HTML; see get_link_parser().
 """
 
 __author__ = "Mark Nottingham <mnot@mnot.net>"
@@ -28,9 +37,13 @@ THE SOFTWARE.
 """
 
 from htmlentitydefs import entitydefs
-from HTMLParser import HTMLParser
+from HTMLParser import HTMLParser, tagfind, attrfind, locatestarttagend
+import re
+from timeit import default_timer as timer
+import unittest
 
 from redbot.message import headers as rh
+from redbot.message.charset import TextDecoder
 from redbot.message import http_syntax as syntax
 
 class HTMLLinkParser(HTMLParser):
@@ -38,14 +51,18 @@ class HTMLLinkParser(HTMLParser):
     Parse the links out of an HTML document in a very forgiving way.
 
     feed() accepts a HttpResponse object and a chunk of the document at a
-    time.
+    time, either as unicode or as bytes in the response's character encoding.
 
     When links are found, link_procs will be called for each with the
     following arguments;
       - base (base URI for the link, in a unicode string)
       - link (URI as it appeared in document, in a unicode string)
-      - tag (name of the element that contained it)
+      - tag (name of the element that contained it; 'css' for links from
+        style elements and attributes)
       - title (title attribute as a unicode string, if any)
+
+    As well as link-bearing attributes, links are found in img and source
+    srcset attributes, style elements and style attributes.
     """
 
     link_parseable_types = [
@@ -59,14 +76,19 @@ class HTMLLinkParser(HTMLParser):
         self.link_procs = link_procs
         self.err = err
         self.doc_enc = None
+        self._decoder = None
         self.link_types = {
-            'link': ['href', ['stylesheet']],
+            'link': ['href', [
+                'stylesheet', 'preload', 'prefetch', 'modulepreload'
+            ]],
             'a': ['href', None],
             'img': ['src', None],
             'script': ['src', None],
             'frame': ['src', None],
             'iframe': ['src', None],
         }
+        self.srcset_tags = ['img', 'source']
+        self._css = CSSLinkParser(base_uri, link_procs, err)
         self.errors = 0
         self.last_err_pos = None
         self.ok = True
@@ -88,16 +110,13 @@ class HTMLLinkParser(HTMLParser):
         if msg.parsed_headers.get('content-type', [None])[0] in \
           self.link_parseable_types:
             try:
-                if chunk.__class__.__name__ != 'unicode':
-                    try:
-                        chunk = unicode(
-                            chunk, 
-                            self.doc_enc or msg.character_encoding, 
-                            'ignore'
-                        )
-                    except LookupError:
-                        pass
-                HTMLParser.feed(self, chunk)
+                if not isinstance(chunk, unicode):
+                    if self._decoder is None:
+                        self._decoder = TextDecoder(msg.character_encoding)
+                    if self.doc_enc:
+                        self._decoder.set_encoding(self.doc_enc)
+                    chunk = self._decoder.decode(chunk)
+                self.parse(chunk)
             except BadErrorIReallyMeanIt:
                 pass
             except Exception, why: # oh, well...
@@ -107,9 +126,33 @@ class HTMLLinkParser(HTMLParser):
         else:
             self.ok = False
 
+    def parse(self, chunk):
+        "Parse a chunk of HTML, as a unicode string."
+        HTMLParser.feed(self, chunk)
+
+    def handle_data(self, data):
+        if self.cdata_elem == 'style':
+            self.parse_style(data)
+
+    def handle_endtag(self, tag):
+        if tag == 'style':
+            self._css.close()
+
+    def parse_style(self, css):
+        "Find links in CSS from the document."
+        self._css.base = self.base
+        self._css.parse(css)
+
     def handle_starttag(self, tag, attrs):
         attr_d = dict(attrs)
         title = attr_d.get('title', '').strip()
+        if attr_d.get('style', None):
+            self.parse_style(attr_d['style'])
+            self._css.close()
+        if tag in self.srcset_tags and attr_d.get('srcset', None):
+            for target in split_srcset(attr_d['srcset']):
+                for proc in self.link_procs:
+                    proc(self.base, target, 'img', title)
         if tag in self.link_types.keys():
             url_attr, rels = self.link_types[tag]
             if not rels or attr_d.get("rel", None) in rels:
@@ -166,8 +209,425 @@ class BadErrorIReallyMeanIt(Exception):
     """See http://bugs.python.org/issue8885 for why this is necessary."""
     pass
 
+
+def split_srcset(srcset):
+    """
+    Return a list of the URLs in a srcset attribute value, e.g.,
+      "a.png 1x, b.png 2x"
+    gives
+      ["a.png", "b.png"]
+    URLs can contain commas, as long as they're not at the end.
+    """
+    urls = []
+    pos = 0
+    length = len(srcset)
+    while pos < length:
+        while pos < length and (srcset[pos].isspace() or srcset[pos] == ","):
+            pos += 1
+        start = pos
+        while pos < length and not srcset[pos].isspace():
+            pos += 1
+        url = srcset[start:pos]
+        if url.endswith(","):
+            url = url.rstrip(",") # no descriptors
+        else:
+            comma = srcset.find(",", pos)
+            pos = comma < 0 and length or comma + 1
+        if url:
+            urls.append(url)
+    return urls
+
+
+class CSSLinkParser(object):
+    """
+    Find the links in a stylesheet; i.e., url() references and @import
+    rules. Has the same interface as HTMLLinkParser, and calls link_procs
+    with a tag of 'css'. data: URLs aren't reported.
+
+    Only the end of the stylesheet that might contain an incomplete
+    reference is kept between chunks (up to keep characters), so memory use
+    doesn't depend upon the size of the stylesheet.
+    """
+
+    link_parseable_types = ['text/css']
+    css_ref = re.compile(r"""
+        /\*.*?\*/ |
+        @charset \s* "(?P<charset>[^"]*)" |
+        @import \s* (?: "(?P<import_dq>[^"]*)" | '(?P<import_sq>[^']*)' ) |
+        url\( \s* (?: "(?P<url_dq>[^"]*)" | '(?P<url_sq>[^']*)' |
+                      (?P<url>[^"'()\s]*) ) \s* \)
+    """, re.VERBOSE | re.DOTALL | re.IGNORECASE)
+    keep = 2048
+
+    def __init__(self, base_uri, link_procs, err=None):
+        self.base = base_uri
+        self.link_procs = link_procs
+        self.err = err
+        self.doc_enc = None
+        self.errors = 0
+        self.ok = True
+        self._decoder = None
+        self._buf = u""
+        self._in_comment = False
+
+    def __getstate__(self):
+        return {
+            'base': self.base,
+            'doc_enc': self.doc_enc,
+            'errors': self.errors,
+            'ok': self.ok,
+        }
+
+    def feed(self, msg, chunk):
+        "Feed a given chunk of CSS to the parser"
+        if not self.ok:
+            return
+        if msg.parsed_headers.get('content-type', [None])[0] not in \
+          self.link_parseable_types:
+            self.ok = False
+            return
+        if not isinstance(chunk, unicode):
+            if self._decoder is None:
+                self._decoder = TextDecoder(msg.character_encoding)
+            if self.doc_enc:
+                self._decoder.set_encoding(self.doc_enc)
+            chunk = self._decoder.decode(chunk)
+        try:
+            self.parse(chunk)
+        except Exception, why: # oh, well...
+            if self.err:
+                self.err("feed problem: %s" % why)
+            self.errors += 1
+
+    def parse(self, chunk):
+        "Parse a chunk of CSS, as a unicode string."
+        buf = self._buf + chunk
+        pos = 0
+        if self._in_comment:
+            pos = buf.find(u"*/")
+            if pos < 0:
+                self._buf = buf[-1:]
+                return
+            pos += 2
+            self._in_comment = False
+        for match in self.css_ref.finditer(buf, pos):
+            if buf.find(u"/*", pos, match.start()) >= 0:
+                break # in an unterminated comment
+            pos = match.end()
+            if match.group('charset'):
+                self.doc_enc = self.doc_enc or match.group('charset')
+                continue
+            link = match.group('import_dq') or match.group('import_sq') or \
+              match.group('url_dq') or match.group('url_sq') or \
+              match.group('url')
+            if not link or link[:5].lower() == u"data:":
+                continue
+            if "#" in link:
+                link = link[:link.index('#')]
+            for proc in self.link_procs:
+                proc(self.base, link, 'css', u"")
+        comment = buf.find(u"/*", pos)
+        if comment >= 0:
+            # an unterminated comment; skip to its end
+            self._in_comment = True
+            self._buf = buf[comment + 2:][-1:]
+        else:
+            self._buf = buf[max(pos, len(buf) - self.keep):]
+
+    def close(self):
+        "Forget any incomplete reference; the CSS has ended."
+        self._buf = u""
+        self._in_comment = False
+
+
+class HTMLLinkScanner(HTMLLinkParser):
+    """
+    A faster HTMLLinkParser.
+
+    Rather than tokenising the whole document, it searches for the tags
+    that links are found in (as well as base and meta), and only parses
+    those. Comments, declarations, processing instructions and the content
+    of script and style elements are skipped over the same way that
+    HTMLParser does.
+
+    Because other tags aren't parsed, a link tag inside one of their quoted
+    attribute values (e.g., <div title="<a href='foo'>">) will be found,
+    whereas HTMLParser would not find it.
+
+    Constructs that are split across chunks are buffered until they're
+    complete, apart from those being skipped over, so memory use doesn't
+    depend upon the size of the document.
+    """
+    markup_open = re.compile(r"""
+        <(?: [!?] | $ |
+            (?:a|link|img|source|script|style|i?frame|base|meta)(?:[\s/>]|$) |
+            (?=[a-z][^<>]*\sstyle\s*=) )
+    """, re.VERBOSE | re.IGNORECASE)
+    style_attr = re.compile(r'\sstyle\s*=', re.IGNORECASE)
+    comment_close = re.compile(r'--\s*>')
+    marked_section_close = re.compile(r'](?:\s*])?\s*>')
+    decl_close = re.compile('>')
+    cdata_tags = ['script', 'style']
+    keep = 16 # chars to keep when skipping, in case a close is split
+
+    def __init__(self, base_uri, link_procs, err=None):
+        HTMLLinkParser.__init__(self, base_uri, link_procs, err)
+        self.wanted_tags = set(
+            self.link_types.keys() + self.srcset_tags + ['base', 'meta']
+        )
+        self._buf = u""
+        self._skip_to = None # regex for the end of what we're skipping
+        self._in_style = False # whether what we're skipping is CSS
+
+    def parse(self, chunk):
+        "Parse a chunk of HTML, as a unicode string."
+        buf = self._buf + chunk
+        self._buf = u""
+        i = 0
+        end = len(buf)
+        while i < end:
+            if self._skip_to:
+                match = self._skip_to.search(buf, i)
+                if not match:
+                    skip_end = max(i, end - self.keep)
+                    if self._in_style:
+                        self.parse_style(buf[i:skip_end])
+                    i = skip_end
+                    break
+                if self._in_style:
+                    self.parse_style(buf[i:match.start()])
+                    self._css.close()
+                    self._in_style = False
+                i = match.end()
+                self._skip_to = None
+                continue
+            match = self.markup_open.search(buf, i)
+            if not match:
+                # keep an unclosed tag, which might turn out to have a
+                # style attribute, or any trailing "<"
+                lt = buf.rfind("<", i)
+                if lt >= 0 and buf.find(">", lt) < 0 and \
+                  (buf[lt+1:lt+2].isalpha() or lt >= end - self.keep):
+                    i = lt
+                else:
+                    i = end
+                break
+            i = match.start()
+            next_char = buf[i+1:i+2]
+            if not next_char:
+                break
+            elif next_char.isalpha():
+                match = tagfind.match(buf, i + 1)
+                tag = match.group(1).lower()
+                tag_end = self._tag_end(buf, i)
+                if tag_end < 0:
+                    break # wait for the rest of the tag
+                self._start_tag(buf, i, tag, match.end(), tag_end)
+                i = tag_end
+            elif buf.startswith("<!--", i):
+                self._skip_to = self.comment_close
+                i += 4
+            elif buf.startswith("<![", i):
+                self._skip_to = self.marked_section_close
+                i += 3
+            elif next_char in u"!?":
+                self._skip_to = self.decl_close
+                i += 2
+            else:
+                i += 1
+        self._buf = buf[i:]
+
+    @staticmethod
+    def _tag_end(buf, start):
+        """
+        Return the offset just after the start tag at start in buf, or -1 if
+        it's not complete yet. Follows HTMLParser.check_for_whole_start_tag.
+        """
+        match = locatestarttagend.match(buf, start)
+        pos = match.end()
+        next_char = buf[pos:pos+1]
+        if next_char == ">":
+            return pos + 1
+        if next_char == "/":
+            if buf.startswith("/>", pos):
+                return pos + 2
+            return -1
+        if next_char == "" or next_char.isalpha() or next_char == "=":
+            return -1
+        return max(pos, start + 1)
+
+    def _start_tag(self, buf, start, tag, pos, tag_end):
+        """
+        Handle the start tag in buf[start:tag_end], if it's interesting. Its
+        attributes start at pos.
+        """
+        self_closing = buf[tag_end-2:tag_end] == "/>"
+        if tag in self.cdata_tags and not self_closing:
+            self._skip_to = re.compile(r'</\s*%s\s*>' % tag, re.I)
+            self._in_style = tag == 'style'
+        if tag not in self.wanted_tags and \
+          not self.style_attr.search(buf, pos - 1, tag_end):
+            return
+        attrs = []
+        while pos < tag_end:
+            match = attrfind.match(buf, pos)
+            if not match:
+                break
+            attr_name, rest, attr_value = match.group(1, 2, 3)
+            if not rest:
+                attr_value = None
+            elif attr_value[:1] == '\'' == attr_value[-1:] or \
+              attr_value[:1] == '"' == attr_value[-1:]:
+                attr_value = attr_value[1:-1]
+            if attr_value:
+                attr_value = self.unescape(attr_value)
+            attrs.append((attr_name.lower(), attr_value))
+            pos = match.end()
+        if buf[pos:tag_end].strip() not in [">", "/>"]:
+            return # HTMLParser treats this as text
+        self.handle_starttag(tag, attrs)
+
+
+LINK_PARSERS = {
+    'htmlparser': HTMLLinkParser,
+    'scanner': HTMLLinkScanner,
+}
+DEFAULT_LINK_PARSER = 'scanner'
+
+MEDIA_TYPE_LINK_PARSERS = {
+    'text/css': CSSLinkParser,
+}
+
+
+def get_link_parser(media_type, parser_name=None):
+    """
+    Return the link parser class to use for media_type. HTML (and anything
+    else without a parser of its own) uses the parser named parser_name, or
+    the default.
+    """
+    if media_type in MEDIA_TYPE_LINK_PARSERS:
+        return MEDIA_TYPE_LINK_PARSERS[media_type]
+    return LINK_PARSERS[parser_name or DEFAULT_LINK_PARSER]
+
+
+class _TextMsg(object):
+    "Just enough of a message to feed a link parser with."
+    parsed_headers = {'content-type': ('text/html', {})}
+    character_encoding = 'utf-8'
+
+
+def find_links(parser_name, doc, chunk_size=4096, media_type='text/html'):
+    """
+    Run the named link parser (or the one for media_type, if it has its own)
+    over doc (a string), fed in chunks of chunk_size. Returns a list of
+    (base, link, tag, title) tuples.
+    """
+    links = []
+    def collect(base, link, tag, title):
+        "Link processor."
+        links.append((base, link, tag, title))
+    parser_class = get_link_parser(media_type, parser_name)
+    parser = parser_class("http://www.example.com/", [collect])
+    msg = _TextMsg()
+    msg.parsed_headers = {'content-type': (media_type, {})}
+    for offset in xrange(0, len(doc), chunk_size):
+        parser.feed(msg, doc[offset:offset + chunk_size])
+    return links
+
+
+def bench_parsers(doc, chunk_size=4096, repeat=3):
+    """
+    Time each link parser over doc. Returns a dictionary of parser name to
+    (best time in seconds, number of links found).
+    """
+    results = {}
+    for name in LINK_PARSERS:
+        best = None
+        for _ in range(repeat):
+            start = timer()
+            links = find_links(name, doc, chunk_size)
+            elapsed = timer() - start
+            if best is None or elapsed < best:
+                best = elapsed
+        results[name] = (best, len(links))
+    return results
+
+
+class LinkScannerTest(unittest.TestCase):
+    corpus = [
+        """<html><head><base href="http://www.example.org/">
+<meta http-equiv="Content-Type" content="text/html; charset=utf-8">
+<link rel=stylesheet href='/a.css'><link rel="alternate" href="/feed">
+<script src="/a.js"></script><script>document.write("<img src='x'>");
+</script><style>a { content: "<a href='y'>"; }</style></head>
+<body><!-- <a href="/commented"> --><a href="/b#frag" title=" B ">b</a>
+<![CDATA[ <a href="/cdata"> ]]><!DOCTYPE html><?pi <a href="/pi"> ?>
+<A HREF="/upper">u</A><img src="/c&amp;d.png"/><iframe src=/f></iframe>
+<a href="/gt>">gt</a><a href="">empty</a> 3 < 4 <frame src="/g">
+<a
+ href="/newline"
+>n</a><img srcset="/s1.png 1x, /s2,x.png 2x,/s3.png" src="/s0.png">
+<picture><source srcset="/wide.webp"></picture><style>
+@import "/imp.css"; /* url(/commented.png) */ b { background: url( '/bg.png' ) }
+</style><div style="background:url(/div.png)">d</div>
+<link rel=preload href="/font.woff2"></body></html>""",
+        """<p>no links, but an unterminated <a href="/x""",
+        """<div class="aaaaaaaaaaaaaaaaaaaaaaaa" style="background:url(/x.png)">
+<img alt="aaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaa" srcset="/y1.png 1x, /y2.png 2x">
+<style>p { color: red; background-color: white; background: url(/z.png) }
+</style><p title="bbbbbbbbbbbbbbbbbbbbbbbbbbbbbbbb">3 < 4</p>""",
+    ]
+
+    def test_same_links(self):
+        for doc in self.corpus:
+            expected = find_links('htmlparser', doc, len(doc))
+            for chunk_size in [1, 2, 3, 7, 20, 30, 40, 64, len(doc)]:
+                self.assertEqual(
+                    find_links('scanner', doc, chunk_size), expected,
+                    "chunk size %s" % chunk_size
+                )
+
+    def test_links(self):
+        links = find_links('scanner', self.corpus[0])
+        self.assertEqual(links[0],
+            ('http://www.example.org/', '/a.css', 'link', ''))
+        self.assertTrue(
+            ('http://www.example.org/', '/b', 'a', 'B') in links)
+        self.assertTrue(
+            ('http://www.example.org/', '/c&d.png', 'img', '') in links)
+        self.assertFalse('/commented' in [l[1] for l in links])
+        for link, tag in [
+            ('/s1.png', 'img'), ('/s2,x.png', 'img'), ('/s3.png', 'img'),
+            ('/wide.webp', 'img'), ('/imp.css', 'css'), ('/bg.png', 'css'),
+            ('/div.png', 'css'), ('/font.woff2', 'link')
+        ]:
+            self.assertTrue(
+                ('http://www.example.org/', link, tag, '') in links, link)
+        self.assertFalse('/commented.png' in [l[1] for l in links])
+
+    def test_split_srcset(self):
+        self.assertEqual(split_srcset(u" a.png 1x,b.png, c,d.png 100w "),
+                         [u"a.png", u"b.png", u"c,d.png"])
+
+    def test_css(self):
+        css = """@charset "iso-8859-1"; @import 'a.css' screen;
+/* url(no.png) */ p { background: url(b.png#x); }
+q { background: url("data:image/png;base64,AAAA") url( "c d.png" ) }"""
+        for chunk_size in range(1, 40) + [len(css)]:
+            links = find_links(None, css, chunk_size, 'text/css')
+            self.assertEqual([l[1:3] for l in links], [
+                ('a.css', 'css'), ('b.png', 'css'), ('c d.png', 'css')
+            ])
+
 if "__main__" == __name__:
     import sys
+    if sys.argv[1:2] == ['--bench']:
+        for filename in sys.argv[2:]:
+            for parser_name, (seconds, count) in sorted(
+              bench_parsers(open(filename).read()).items()):
+                print "%s %s: %.4fs (%s links)" % (
+                    filename, parser_name, seconds, count)
+        sys.exit(0)
     from redbot.resource.fetch import RedFetcher
     uri = sys.argv[1]
     req_hdrs = [(u'Accept-Encoding', u'gzip')]
@@ -0,0 +1,237 @@
+#!/usr/bin/env python
+
+"""
+Pre-forked serving.
+
+A Supervisor forks a number of worker processes that share one listening
+socket, each running its own thor loop; see serve(). It restarts workers
+that exit, and when it gets:
+  - SIGHUP, starts a new set of workers and has the old ones drain, and
+  - SIGTERM or SIGINT, has all of the workers drain, and then exits.
+
+A draining worker stops accepting connections, and exits once it's
+finished the exchanges it has in progress (or after DRAIN_TIMEOUT).
+"""
+
+__author__ = "Mark Nottingham <mnot@mnot.net>"
+__copyright__ = """\
+Copyright (c) 2008-2013 Mark Nottingham
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+"""
+
+import errno
+import os
+import pkgutil
+import select
+import signal
+import sys
+import time
+import traceback
+
+import thor
+import thor.loop
+from thor.events import EventEmitter
+from thor.http import HttpServer
+from thor.tcp import TcpServer
+
+### configuration
+DRAIN_TIMEOUT = 60 # seconds to let a draining worker finish its exchanges
+CHECK_INTERVAL = 0.5 # seconds between a worker checking for signals
+RESTART_DELAY = 1 # seconds to wait before restarting a worker that died young
+
+
+def warm_up():
+    """
+    Import the modules that are otherwise loaded when they're first
+    needed (header handlers, formatters, note text), so that forked
+    workers start ready, and share them.
+    """
+    from redbot.message import headers
+    from redbot import formatter
+    import redbot.note_text
+    import redbot.resource
+    for importer, name, is_pkg in pkgutil.iter_modules(headers.__path__):
+        __import__("redbot.message.headers.%s" % name)
+    for name in formatter.available_formatters(plugins=False):
+        formatter.find_formatter(name)
+
+
+def reset_loop():
+    """
+    Give this (forked) process its own thor loop; otherwise, it would share
+    its poller with its parent and siblings. Events that the parent had
+    scheduled are dropped.
+    """
+    loop = thor.loop._loop
+    if hasattr(loop, '_epoll'):
+        loop._epoll.close()
+        loop._epoll = select.epoll()
+    elif hasattr(loop, '_kq'):
+        loop._kq.close()
+        loop._kq = select.kqueue()
+    else:
+        loop._poll = select.poll()
+    loop._fd_targets.clear()
+    del loop._LoopBase__sched_events[:]
+
+
+class SharedHttpServer(HttpServer):
+    "A thor HttpServer that accepts connections on an existing socket."
+    def __init__(self, sock):
+        EventEmitter.__init__(self)
+        host, port = sock.getsockname()[:2]
+        self.tcp_server = TcpServer(host, port, sock=sock)
+        self.tcp_server.on('connect', self.handle_conn)
+        thor.schedule(0, self.emit, 'start')
+
+    def shutdown(self):
+        "Stop accepting connections."
+        self.tcp_server.unregister_fd()
+        HttpServer.shutdown(self)
+
+
+def serve(sock, handle_exchange):
+    """
+    Serve HTTP on the listening socket sock in this process until it gets
+    SIGTERM, calling handle_exchange with each exchange. Then, drain.
+    """
+    server = SharedHttpServer(sock)
+    active = [0]
+    drain_start = []
+
+    def exchange(x):
+        active[0] += 1
+        response_done = x.response_done
+        def done(trailers):
+            active[0] -= 1
+            response_done(trailers)
+        x.response_done = done
+        handle_exchange(x)
+    server.on('exchange', exchange)
+
+    def check():
+        if drain_start:
+            if len(drain_start) == 1:
+                server.shutdown()
+                drain_start.append(True)
+            if active[0] <= 0 or time.time() - drain_start[0] > DRAIN_TIMEOUT:
+                thor.stop()
+                return
+        thor.schedule(CHECK_INTERVAL, check)
+    thor.schedule(CHECK_INTERVAL, check)
+
+    # signal handlers just note the signal; check() acts on it.
+    signal.signal(signal.SIGTERM,
+                  lambda signum, frame: drain_start.append(time.time()))
+    while True:
+        try:
+            thor.run()
+            break
+        except (IOError, OSError, select.error), why:
+            if why.args[0] != errno.EINTR: # the signal interrupted polling
+                raise
+
+
+class Supervisor(object):
+    """
+    Fork workers processes, each calling run_worker(sock, index), and keep
+    them running; see the module docstring. index identifies a worker's
+    slot, so that it can take on jobs that only one worker should do.
+    """
+    def __init__(self, sock, workers, run_worker):
+        self.sock = sock
+        self.workers = workers
+        self.run_worker = run_worker
+        self.children = {} # pid: (index, start time)
+        self.draining = set() # pids
+        self.stopping = False
+        self.reloading = False
+
+    def run(self):
+        "Run the workers until told to stop."
+        def stop(signum, frame):
+            self.stopping = True
+        def reload(signum, frame):
+            self.reloading = True
+        signal.signal(signal.SIGTERM, stop)
+        signal.signal(signal.SIGINT, stop)
+        signal.signal(signal.SIGHUP, reload)
+        for index in range(self.workers):
+            self.spawn(index)
+        stopped = False
+        while self.children:
+            if self.stopping and not stopped:
+                self.drain(self.children.keys())
+                stopped = True
+            if self.reloading and not self.stopping:
+                self.reloading = False
+                old = [pid for pid in self.children if pid not in self.draining]
+                for index in range(self.workers):
+                    self.spawn(index)
+                self.drain(old)
+            try:
+                pid, status = os.wait()
+            except OSError, why:
+                if why.errno == errno.EINTR:
+                    continue
+                raise
+            self.reap(pid)
+
+    def spawn(self, index):
+        "Start a worker in slot index."
+        pid = os.fork()
+        if pid == 0:
+            status = 0
+            try:
+                signal.signal(signal.SIGTERM, signal.SIG_DFL)
+                signal.signal(signal.SIGHUP, signal.SIG_DFL)
+                signal.signal(signal.SIGINT, signal.SIG_IGN) # we drain
+                reset_loop()
+                self.run_worker(self.sock, index)
+            except:
+                traceback.print_exc()
+                status = 1
+            os._exit(status)
+        self.children[pid] = (index, time.time())
+
+    def drain(self, pids):
+        "Have the given workers drain and exit."
+        for pid in pids:
+            self.draining.add(pid)
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except OSError:
+                pass
+
+    def reap(self, pid):
+        "Note that a worker has exited, and replace it if need be."
+        index, started = self.children.pop(pid, (None, None))
+        if index is None:
+            return
+        if pid in self.draining:
+            self.draining.remove(pid)
+            return
+        if self.stopping:
+            return
+        sys.stderr.write("* Worker %s (PID %s) died; restarting.\n" % (
+            index, pid))
+        if time.time() - started < RESTART_DELAY:
+            time.sleep(RESTART_DELAY)
+        self.spawn(index)
@@ -0,0 +1,225 @@
+#!/usr/bin/env python
+
+"""
+A cache of rendered saved tests.
+
+Saved tests don't change, so once one has been rendered in a given way
+(its variant; e.g., the format, subrequest and whether it's been saved),
+the result can be reused. Rendered pages are kept gzipped, in memory (the
+most recently rendered or read RENDER_CACHE_SIZE of them) and on disk next
+to the saved test, with the same mtime so that they expire with it.
+
+Each page gets a strong ETag made from its test_id and a hash of its
+content, so that repeat views can be answered with a 304.
+"""
+
+__author__ = "Mark Nottingham <mnot@mnot.net>"
+__copyright__ = """\
+Copyright (c) 2008-2013 Mark Nottingham
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+"""
+
+from collections import deque
+import hashlib
+import os
+import shutil
+import tempfile
+import unittest
+import zlib
+
+### configuration
+RENDER_CACHE_SIZE = 64 # rendered pages to keep in memory
+
+
+class RenderCache(object):
+    """
+    Rendered pages, by test_id and variant. Variants are tuples of
+    strings, booleans or None, and should only be made from values that
+    have been checked, so that clients can't create them at will.
+    """
+    def __init__(self, size=RENDER_CACHE_SIZE):
+        self.size = size
+        self._pages = {} # (test_id, variant): (etag, gz_body)
+        self._order = deque() # keys in _pages, oldest first
+
+    def get(self, test_id, test_path, variant):
+        """
+        Return (etag, gzipped body) for the variant of the test stored at
+        test_path, or None if it hasn't been rendered.
+        """
+        key = (test_id, variant)
+        try:
+            return self._pages[key]
+        except KeyError:
+            pass
+        page = self._read(self._path(test_path, variant))
+        if page is not None:
+            self._remember(key, page)
+        return page
+
+    def put(self, test_id, test_path, variant, body):
+        """
+        Remember body (bytes) as the variant of the test stored at
+        test_path, returning (etag, gzipped body). Errors writing it to
+        disk are discarded.
+
+        The disk copy is written to a temporary file and moved into place,
+        so that other processes never see part of one.
+        """
+        etag = '"%s-%s"' % (test_id, hashlib.md5(body).hexdigest()[:16])
+        gz_body = gzip_bytes(body)
+        page = (etag, gz_body)
+        self._remember((test_id, variant), page)
+        path = self._path(test_path, variant)
+        try:
+            tmp_fd, tmp_path = tempfile.mkstemp(
+                suffix=".tmp", dir=os.path.dirname(path))
+        except (IOError, OSError):
+            return page
+        try:
+            fd = os.fdopen(tmp_fd, 'wb')
+            try:
+                fd.write("%s\n" % etag)
+                fd.write(gz_body)
+            finally:
+                fd.close()
+            mtime = os.stat(test_path).st_mtime
+            os.utime(tmp_path, (mtime, mtime))
+            os.rename(tmp_path, path)
+        except (IOError, OSError):
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+        return page
+
+    def _remember(self, key, page):
+        if key not in self._pages:
+            if len(self._pages) >= self.size:
+                del self._pages[self._order.popleft()]
+            self._order.append(key)
+        self._pages[key] = page
+
+    @staticmethod
+    def _path(test_path, variant):
+        return "%s.%s.gz" % (
+            test_path, hashlib.md5(repr(variant)).hexdigest()[:12]
+        )
+
+    @staticmethod
+    def _read(path):
+        "Read a page from disk; returns None if it's missing or damaged."
+        try:
+            fd = open(path, 'rb')
+        except IOError:
+            return None
+        try:
+            etag = fd.readline().strip()
+            gz_body = fd.read()
+        finally:
+            fd.close()
+        if not etag:
+            return None
+        try:
+            gunzip_bytes(gz_body)
+        except zlib.error:
+            return None
+        return etag, gz_body
+
+
+def gzip_bytes(body):
+    "Return body, gzipped."
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    return compressor.compress(body) + compressor.flush()
+
+
+def gunzip_bytes(gz_body):
+    "Return gz_body, gunzipped."
+    return zlib.decompress(gz_body, 16 + zlib.MAX_WBITS)
+
+
+def etag_matches(if_none_match, etag):
+    "Return whether etag is matched by the If-None-Match header value."
+    if if_none_match is None:
+        return False
+    tags = [tag.strip() for tag in if_none_match.split(",")]
+    return etag in tags or "*" in tags
+
+
+def accepts_gzip(accept_encoding):
+    "Return whether the Accept-Encoding header value allows gzip."
+    for coding in (accept_encoding or "").split(","):
+        params = [p.strip() for p in coding.split(";")]
+        if params[0].lower() not in ['gzip', 'x-gzip']:
+            continue
+        for param in params[1:]:
+            name, value = (param.split("=", 1) + [""])[:2]
+            if name.strip().lower() == "q":
+                try:
+                    return float(value.strip()) > 0
+                except ValueError:
+                    return False
+        return True
+    return False
+
+
+class RenderCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.test_path = os.path.join(self.dir, "abc")
+        open(self.test_path, 'w').close()
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def test_cache(self):
+        cache = RenderCache(1)
+        self.assertEqual(cache.get("abc", self.test_path, ('html',)), None)
+        etag, gz_body = cache.put("abc", self.test_path, ('html',), "foo")
+        self.assertTrue(etag.startswith('"abc-'))
+        self.assertEqual(gunzip_bytes(gz_body), "foo")
+        cache.put("abc", self.test_path, ('txt',), "bar")
+        self.assertEqual(len(cache._pages), 1)
+        # from disk
+        self.assertEqual(cache.get("abc", self.test_path, ('html',)),
+                         (etag, gz_body))
+        self.assertEqual(RenderCache().get("abc", self.test_path, ('html',)),
+                         (etag, gz_body))
+        self.assertFalse([n for n in os.listdir(self.dir) if "tmp" in n])
+
+    def test_damaged(self):
+        path = RenderCache._path(self.test_path, ('html',))
+        etag, gz_body = RenderCache().put("abc", self.test_path, ('html',),
+                                          "foo" * 100)
+        for content in ["", "%s\n" % etag, "%s\n%s" % (etag, gz_body[:-4])]:
+            open(path, 'wb').write(content)
+            self.assertEqual(
+                RenderCache().get("abc", self.test_path, ('html',)), None)
+
+    def test_headers(self):
+        self.assertTrue(etag_matches('"a", "b"', '"b"'))
+        self.assertTrue(etag_matches('*', '"b"'))
+        self.assertFalse(etag_matches('W/"b"', '"b"'))
+        self.assertFalse(etag_matches(None, '"b"'))
+        self.assertTrue(accepts_gzip("deflate, gzip;q=0.5"))
+        self.assertFalse(accepts_gzip("gzip;q=0"))
+        self.assertFalse(accepts_gzip("gzip; q=0.000"))
+        self.assertTrue(accepts_gzip("gzip;q=0.001"))
+        self.assertFalse(accepts_gzip(None))
@@ -54,15 +54,29 @@ class HttpResource(RedFetcher):
 
     After processing the response-specific attributes of RedFetcher will be
     populated, as well as its notes; see that class for details.
+
+    link_parser selects the parser used to find links in the response; see
+    redbot.message.link_parse.LINK_PARSERS.
+
+    Links to subresources are also taken from Link response headers with a
+    preload, prefetch or modulepreload relation. When descending, a linked
+    resource passes the links in its CSS (tagged 'css') up to its parent, so
+    that they get checked too. Each linked resource is emitted as a 'linked'
+    event (along with its tag) before it's run.
     """
+    preload_rels = ['preload', 'prefetch', 'modulepreload']
+
     def __init__(self, uri, method="GET", req_hdrs=None, req_body=None,
-                status_cb=None, body_procs=None, descend=False):
+                status_cb=None, body_procs=None, descend=False,
+                link_parser=None, parent=None):
         orig_req_hdrs = req_hdrs or []
         new_req_hdrs = orig_req_hdrs + [(u'Accept-Encoding', u'gzip')]
         RedFetcher.__init__(self, uri, method, new_req_hdrs, req_body,
                             status_cb, body_procs, name=method)
         self.descend = descend
-        self.response.set_link_procs([self.process_link])
+        self.link_parser = link_parser
+        self.parent = parent
+        self.response.set_link_procs([self.process_link], link_parser)
         self.subreqs = {} # sub-requests' RedState objects
         self.links = {}          # {type: set(link...)}
         self.link_count = 0
@@ -81,9 +95,18 @@ class HttpResource(RedFetcher):
         """
         if self.response.complete:
             active_check.spawn_all(self)
+        for link, params in self.response.parsed_headers.get('link', []):
+            rels = params.get('rel', '').lower().split()
+            if [rel for rel in rels if rel in self.preload_rels]:
+                self.process_link(self.response.base_uri, link, 'link',
+                                  params.get('title', ''))
 
     def process_link(self, base, link, tag, title):
         "Handle a link from content"
+        if tag == 'css' and self.parent:
+            self.parent.process_link(self.parent.response.base_uri,
+                                     urljoin(base, link), tag, title)
+            return
         self.link_count += 1
         if not self.links.has_key(tag):
             self.links[tag] = set()
@@ -92,8 +115,11 @@ class HttpResource(RedFetcher):
                 urljoin(base, link),
                 req_hdrs=self.orig_req_hdrs,
                 status_cb=self.status_cb,
+                link_parser=self.link_parser,
+                parent=self,
             )
             self.linked.append((linked, tag))
+            self.emit('linked', linked, tag)
             self.add_task(linked.run)
         self.links[tag].add(link)
         if not self.response.base_uri:
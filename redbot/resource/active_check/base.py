@@ -37,6 +37,9 @@ class SubRequest(RedFetcher):
     """
     Base class for a subrequest of a "main" HttpResource, made to perform
     additional behavioural tests on the resource.
+
+    When its response is done, the base resource emits 'check_done' with
+    the subrequest, so that its notes can be shown.
     """
     def __init__(self, base_resource, name):
         self.base = base_resource
@@ -51,6 +54,10 @@ class SubRequest(RedFetcher):
                             name
         )
         self.base.subreqs[name] = self
+        self.on('response_done', self._check_done)
+
+    def _check_done(self):
+        self.base.emit('check_done', self)
     
     def modify_req_hdrs(self):
         """
@@ -38,6 +38,7 @@ from robotparser import RobotFileParser
 from urlparse import urlsplit
 
 import thor
+from thor.events import EventEmitter
 import thor.http.error as httperr
 
 from redbot import __version__
@@ -57,14 +58,15 @@ class RedHttpClient(thor.http.HttpClient):
     read_timeout = 15
 
 
-class RedFetcher(RedState):
+class RedFetcher(RedState, EventEmitter):
     """
     Abstract class for a fetcher.
 
     Fetches the given URI (with the provided method, headers and body) and
     calls:
       - status_cb as it progresses, and
-      - every function in the body_procs list with each chunk of the body, and
+      - every function in the body_procs list with each chunk of the body
+        (decoded into unicode; see HttpMessage.set_decoded_procs), and
       - done_cb when all tasks are done.
     If provided, type indicates the type of the request, and is used to
     help set notes and status_cb appropriately.
@@ -72,6 +74,12 @@ class RedFetcher(RedState):
     The done() method is called when the response is done, NOT when all
     tasks are done. It can add tasks by calling add_task().
 
+    It also emits these events, so that results can be shown as they
+    become available:
+      - 'response_start' when the response headers have been checked, and
+      - 'response_done' when the response is done (whether or not it's
+        complete) and done() has been called, and
+      - 'tasks_done' when all tasks are done, just before done_cb is called.
     """
     client = RedHttpClient()
     robot_files = {} # cache of robots.txt
@@ -81,6 +89,7 @@ class RedFetcher(RedState):
     def __init__(self, iri, method="GET", req_hdrs=None, req_body=None,
                  status_cb=None, body_procs=None, name=None):
         RedState.__init__(self, name)
+        EventEmitter.__init__(self)
         self.request = HttpRequest(self.notes, self.name)
         self.request.method = method
         self.request.set_iri(iri)
@@ -102,6 +111,7 @@ class RedFetcher(RedState):
         del state['exchange']
         del state['status_cb']
         del state['done_cb']
+        del state['_EventEmitter__events']
         return state
 
     def add_task(self, task, *args):
@@ -116,6 +126,7 @@ class RedFetcher(RedState):
         self._st.append('finish_task()')
         assert self.outstanding_tasks >= 0, self._st
         if self.outstanding_tasks == 0:
+            self.emit('tasks_done')
             if self.done_cb:
                 self.done_cb()
                 self.done_cb = None
@@ -270,6 +281,7 @@ class RedFetcher(RedState):
         self.response.set_headers(res_headers)
         StatusChecker(self.response, self.request)
         checkCaching(self.response, self.request)
+        self.emit('response_start')
 
     def _response_body(self, chunk):
         "Process a chunk of the response body."
@@ -287,6 +299,7 @@ class RedFetcher(RedState):
                 self.request.uri, self.name
             ))
         self.done()
+        self.emit('response_done')
         self.finish_task()
 
     def _response_error(self, error):
@@ -304,6 +317,7 @@ class RedFetcher(RedState):
                 chunk_sample=err_msg.encode('string_escape')
             )
         self.done()
+        self.emit('response_done')
         self.finish_task()
 
 
@@ -0,0 +1,175 @@
+#!/usr/bin/env python
+
+"""
+Page weight.
+
+Summarises the bytes transferred for a resource and the resources it links
+to (when descending), and where they could be reduced; i.e., by
+compression, or by making responses cacheable.
+"""
+
+__author__ = "Mark Nottingham <mnot@mnot.net>"
+__copyright__ = """\
+Copyright (c) 2008-2013 Mark Nottingham
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+"""
+
+import unittest
+import zlib
+
+### configuration
+TOP_OFFENDERS = 10  # how many resources to list in the report
+MIN_SAMPLE = 256  # don't estimate compression from samples smaller than this
+
+
+def page_weight(state, top=TOP_OFFENDERS):
+    """
+    Return a JSON-serialisable dictionary describing the weight of state
+    (an HttpResource) and its linked resources:
+
+      - resources: the number of complete responses counted
+      - transfer_bytes: total body bytes, as transferred
+      - savable_bytes: how many of those compression could save
+      - uncacheable_bytes: bytes in responses that can't be reused from a
+        shared cache (because they can't be stored, or aren't fresh)
+      - offenders: up to top resources with potential savings, largest
+        first; each a dictionary of uri, transfer_bytes, savable_bytes
+        and uncacheable
+
+    Each URI is only counted once.
+    """
+    totals = {
+        'resources': 0,
+        'transfer_bytes': 0,
+        'savable_bytes': 0,
+        'uncacheable_bytes': 0,
+    }
+    offenders = []
+    seen = set()
+    for resource in [state] + [linked[0] for linked in state.linked]:
+        response = resource.response
+        if not response.complete or resource.request.uri in seen:
+            continue
+        seen.add(resource.request.uri)
+        savable = compression_savings(resource)
+        uncacheable = is_uncacheable(response)
+        totals['resources'] += 1
+        totals['transfer_bytes'] += response.payload_len
+        totals['savable_bytes'] += savable
+        if uncacheable:
+            totals['uncacheable_bytes'] += response.payload_len
+        if savable or uncacheable:
+            offenders.append({
+                'uri': resource.request.uri,
+                'transfer_bytes': response.payload_len,
+                'savable_bytes': savable,
+                'uncacheable': uncacheable,
+            })
+    offenders.sort(key=lambda o: (
+        o['savable_bytes'],
+        o['uncacheable'] and o['transfer_bytes'] or 0
+    ), reverse=True)
+    totals['offenders'] = offenders[:top]
+    return totals
+
+
+def compression_savings(resource):
+    """
+    Return an estimate of how many body bytes content-coding would save
+    for resource.
+
+    If the content negotiation check found that gzip is already in use,
+    there's nothing more to save. Otherwise, the body sample is compressed
+    to estimate the ratio.
+    """
+    response = resource.response
+    if resource.gzip_support or \
+      response.parsed_headers.get('content-encoding', []):
+        return 0
+    sample = "".join([chunk for (offset, chunk) in response.payload_sample])
+    if len(sample) < MIN_SAMPLE:
+        return 0
+    ratio = float(len(zlib.compress(sample, 6))) / len(sample)
+    return max(0, int(response.payload_len * (1 - ratio)))
+
+
+def is_uncacheable(response):
+    """
+    Whether response can't be reused from a shared cache; i.e., it can't
+    be stored, or it has no freshness. Responses with Last-Modified but no
+    explicit freshness have a freshness_lifetime of 0, but can be given a
+    heuristic one.
+    """
+    if response.store_shared is False:
+        return True
+    if response.freshness_lifetime > 0:
+        return False
+    return not response.parsed_headers.has_key('last-modified')
+
+
+class PageWeightTest(unittest.TestCase):
+    class Resource(object):
+        "Just enough of an HttpResource."
+        def __init__(self, uri, body, store_shared=True, gzip_support=None,
+                     headers=None, freshness_lifetime=60):
+            from redbot.message import HttpResponse
+            self.request = self
+            self.uri = uri
+            self.gzip_support = gzip_support
+            self.linked = []
+            self.response = HttpResponse()
+            self.response.set_headers(headers or [])
+            self.response.feed_body(body)
+            self.response.complete = True
+            self.response.store_shared = store_shared
+            self.response.freshness_lifetime = freshness_lifetime
+
+    def test_page_weight(self):
+        page = self.Resource("http://example.com/", "<p>hello</p>" * 1000)
+        css = self.Resource("http://example.com/a.css", "a{}" * 100,
+                            store_shared=False)
+        img = self.Resource("http://example.com/a.png", "x" * 10000,
+                            gzip_support=True)
+        page.linked = [(css, 'link'), (img, 'img'), (css, 'link')]
+        weight = page_weight(page)
+        self.assertEqual(weight['resources'], 3)
+        self.assertEqual(weight['transfer_bytes'], 12000 + 300 + 10000)
+        self.assertEqual(weight['uncacheable_bytes'], 300)
+        self.assertTrue(
+            11000 < weight['offenders'][0]['savable_bytes'] < 12000)
+        self.assertEqual(weight['savable_bytes'],
+            sum([o['savable_bytes'] for o in weight['offenders']]))
+        self.assertEqual(
+            [o['uri'] for o in weight['offenders']],
+            ["http://example.com/", "http://example.com/a.css"]
+        )
+
+    def test_uncacheable(self):
+        heuristic = self.Resource("http://example.com/a.js", "", headers=[
+            ("Last-Modified", "Sun, 06 Nov 1994 08:49:37 GMT")
+        ], freshness_lifetime=0)
+        self.assertFalse(is_uncacheable(heuristic.response))
+        none = self.Resource("http://example.com/b.js", "",
+                             freshness_lifetime=0)
+        self.assertTrue(is_uncacheable(none.response))
+        etag = self.Resource("http://example.com/c.js", "",
+                             headers=[("ETag", '"abc"')],
+                             freshness_lifetime=0)
+        self.assertTrue(is_uncacheable(etag.response))
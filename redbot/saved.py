@@ -0,0 +1,400 @@
+#!/usr/bin/env python
+
+"""
+Saved tests.
+
+A saved test is stored in a purpose-built format, rather than by pickling
+the HttpResource, so that it doesn't depend on how the classes involved are
+laid out, and so that a part of it can be read without reading the rest.
+
+The file starts with a line identifying the format and its version, then
+a line of JSON indexing the sections that follow it by name, as
+[offset, length]. Each section is zlib-compressed JSON. The main resource
+is in the "main" section, its subrequests in "subreq/<name>", and linked
+resources in "linked/<n>" (with their subrequests in
+"linked/<n>/subreq/<name>").
+
+Each resource section holds the public attributes of the resource and of
+its request and response that are plain data, as well as its notes, and
+the names of its subrequests and the tags of its linked resources. Values
+are tagged to preserve types that JSON doesn't have; see encode().
+
+Loading a saved test reads only the main section; subrequests and linked
+resources are read when they're first looked at.
+"""
+
+__author__ = "Mark Nottingham <mnot@mnot.net>"
+__copyright__ = """\
+Copyright (c) 2008-2013 Mark Nottingham
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+"""
+
+import gzip
+import json
+from UserDict import DictMixin
+from StringIO import StringIO
+import unittest
+import zlib
+
+import thor.http.error as httperr
+
+import redbot.speak as rs
+from redbot.message import HttpRequest, HttpResponse
+from redbot.state import RedState
+
+### configuration
+MAGIC = "REDBOT-SAVED"
+VERSION = 1
+
+# attributes that are saved separately, or not at all
+SKIP_ATTRS = set([
+    'request', 'response', 'notes', 'subreqs', 'linked', 'parent', 'base',
+    'exchange', 'status_cb', 'done_cb'
+])
+
+
+class SaveError(Exception):
+    "A saved test couldn't be read."
+    pass
+
+
+def encode(value):
+    """
+    Return a JSON-serialisable version of value. Dictionaries, tuples,
+    sets, byte strings and HTTP errors are wrapped in an object whose only
+    member says what they are; lists, unicode strings, numbers, booleans
+    and None are left alone.
+
+    Raises TypeError if value (or anything in it) can't be encoded.
+    """
+    if value is None or isinstance(value, (bool, int, long, float, unicode)):
+        return value
+    if isinstance(value, str):
+        return {'b': value.decode('iso-8859-1')}
+    if isinstance(value, list):
+        return [encode(v) for v in value]
+    if isinstance(value, tuple):
+        return {'t': [encode(v) for v in value]}
+    if isinstance(value, (set, frozenset)):
+        return {'s': [encode(v) for v in value]}
+    if isinstance(value, dict):
+        return {'d': [[encode(k), encode(v)] for (k, v) in value.items()]}
+    if isinstance(value, httperr.HttpError):
+        return {'e': [value.__class__.__name__, value.detail]}
+    raise TypeError, "Can't encode %s" % type(value)
+
+
+def decode(value):
+    "Reverse encode()."
+    if isinstance(value, list):
+        return [decode(v) for v in value]
+    if not isinstance(value, dict):
+        return value
+    kind, value = value.items()[0]
+    if kind == 'b':
+        return value.encode('iso-8859-1')
+    if kind == 't':
+        return tuple([decode(v) for v in value])
+    if kind == 's':
+        return set([decode(v) for v in value])
+    if kind == 'd':
+        return dict([(decode(k), decode(v)) for (k, v) in value])
+    if kind == 'e':
+        return getattr(httperr, value[0], httperr.HttpError)(value[1])
+    raise SaveError, "Unknown value type %r" % kind
+
+
+def encode_attrs(obj):
+    """
+    Return a dictionary of the public attributes of obj that are plain
+    data, encoded.
+    """
+    attrs = {}
+    for name, value in obj.__dict__.items():
+        if name[0] == "_" or name in SKIP_ATTRS:
+            continue
+        try:
+            attrs[name] = encode(value)
+        except TypeError:
+            pass
+    return attrs
+
+
+def encode_notes(notes):
+    "Return a list of encoded notes; see rs.Notes.records()."
+    out = []
+    for note, subject, subreq, name, vrs in notes.records():
+        encoded_vars = []
+        for k, v in vrs:
+            try:
+                encoded_vars.append([k, encode(v)])
+            except TypeError:
+                encoded_vars.append([k, unicode(v)])
+        out.append([note.__name__, subject, subreq, name, encoded_vars])
+    return out
+
+
+def decode_notes(notes):
+    "Reverse encode_notes(), returning a rs.Notes."
+    out = rs.Notes()
+    for note_name, subject, subreq, name, vrs in notes:
+        note = getattr(rs, note_name, None)
+        if note is None: # it's since been removed
+            continue
+        out.add(note, subject, subreq, name,
+                tuple([(k, decode(v)) for (k, v) in vrs]))
+    return out
+
+
+def save(resource, fd):
+    "Write resource to the file-like object fd as a saved test."
+    write(snapshot(resource), fd)
+
+
+def snapshot(resource):
+    """
+    Return the sections of a saved test for resource, as a list of
+    (name, section), where each section is plain data that doesn't refer
+    to resource; see write().
+    """
+    sections = []
+    _add_sections(resource, 'main', sections)
+    return sections
+
+
+def write(sections, fd):
+    "Write sections from snapshot() to the file-like object fd."
+    data = [(name, zlib.compress(json.dumps(section, separators=(',', ':'))))
+            for (name, section) in sections]
+    index = {}
+    offset = 0
+    for name, section_data in data:
+        index[name] = [offset, len(section_data)]
+        offset += len(section_data)
+    fd.write("%s %s\n" % (MAGIC, VERSION))
+    fd.write(json.dumps(index, separators=(',', ':')))
+    fd.write("\n")
+    for name, section_data in data:
+        fd.write(section_data)
+
+
+def _add_sections(state, name, sections):
+    "Append (name, section) for state and the states under it to sections."
+    subreqs = getattr(state, 'subreqs', {})
+    linked = getattr(state, 'linked', [])
+    section = {
+        'attrs': encode_attrs(state),
+        'request': encode_attrs(state.request),
+        'response': encode_attrs(state.response),
+        'notes': encode_notes(state.notes),
+        'subreqs': subreqs.keys(),
+        'linked': [tag for (linked_state, tag) in linked],
+    }
+    sections.append((name, section))
+    prefix = name != 'main' and "%s/" % name or ""
+    for subreq_name, subreq in subreqs.items():
+        _add_sections(subreq, "%ssubreq/%s" % (prefix, subreq_name), sections)
+    for i, (linked_state, tag) in enumerate(linked):
+        _add_sections(linked_state, "%slinked/%s" % (prefix, i), sections)
+
+
+class SavedTest(object):
+    """
+    A saved test, read from the file-like object fd, which needs to stay
+    open while the test is being looked at.
+
+    Tests saved by earlier versions (which pickled the HttpResource) are
+    read in full.
+
+    Raises SaveError if fd doesn't contain a saved test.
+    """
+    def __init__(self, fd):
+        self.fd = fd
+        self.index = {}
+        self.legacy = None
+        self._resource = None
+        first = fd.readline()
+        if first[:2] == "\x1f\x8b": # gzip
+            fd.seek(0)
+            self.legacy = _load_legacy(fd)
+            return
+        try:
+            magic, version = first.split()
+            version = int(version)
+        except ValueError:
+            raise SaveError, "Not a saved test."
+        if magic != MAGIC or version > VERSION:
+            raise SaveError, "Unsupported saved test version."
+        try:
+            self.index = json.loads(fd.readline())
+        except ValueError, why:
+            raise SaveError, "Bad index: %s" % why
+        self.start = fd.tell()
+
+    def section(self, name):
+        "Return the decoded contents of the named section."
+        try:
+            offset, length = self.index[name]
+        except KeyError:
+            raise SaveError, "No section %s." % name
+        self.fd.seek(self.start + offset)
+        try:
+            return json.loads(zlib.decompress(self.fd.read(length)))
+        except (zlib.error, ValueError), why:
+            raise SaveError, "Bad section %s: %s" % (name, why)
+
+    def resource(self):
+        "Return the main resource."
+        if self.legacy:
+            return self.legacy
+        if self._resource is None:
+            self._resource = SavedState(self, 'main')
+        return self._resource
+
+    def subreq(self, name):
+        "Return the named subrequest of the main resource, or None."
+        if self.legacy:
+            return self.legacy.subreqs.get(name, None)
+        name = "subreq/%s" % name
+        if name not in self.index:
+            return None
+        return SavedState(self, name)
+
+
+def _load_legacy(fd):
+    "Unpickle a gzipped HttpResource."
+    import cPickle as pickle
+    try:
+        return pickle.load(gzip.GzipFile(fileobj=fd))
+    except (pickle.PickleError, IOError, EOFError, zlib.error), why:
+        raise SaveError, "Bad saved test: %s" % why
+
+
+class SavedState(RedState):
+    """
+    A resource or subrequest loaded from a saved test; it has the same
+    attributes as the original, but none of its behaviour.
+    """
+    def __init__(self, saved, section_name):
+        section = saved.section(section_name)
+        RedState.__init__(self, None)
+        for name, value in section['attrs'].items():
+            setattr(self, name, decode(value))
+        self.notes = decode_notes(section['notes'])
+        self.request = HttpRequest(self.notes, self.name)
+        for name, value in section['request'].items():
+            setattr(self.request, name, decode(value))
+        self.response = HttpResponse(self.notes, self.name)
+        for name, value in section['response'].items():
+            setattr(self.response, name, decode(value))
+        prefix = section_name != 'main' and "%s/" % section_name or ""
+        self.subreqs = SavedSubreqs(saved, prefix, section['subreqs'])
+        self._linked = None
+        self._linked_tags = section['linked']
+        self._saved = saved
+        self._prefix = prefix
+
+    @property
+    def linked(self):
+        "Linked resources are loaded the first time they're asked for."
+        if self._linked is None:
+            self._linked = [
+                (SavedState(self._saved, "%slinked/%s" % (self._prefix, i)),
+                 tag) for (i, tag) in enumerate(self._linked_tags)
+            ]
+        return self._linked
+
+
+class SavedSubreqs(DictMixin):
+    "The subrequests of a SavedState, loaded when they're looked up."
+    def __init__(self, saved, prefix, names):
+        self.saved = saved
+        self.prefix = prefix
+        self.names = names
+        self.loaded = {}
+
+    def __getitem__(self, name):
+        if name not in self.names:
+            raise KeyError, name
+        if not self.loaded.has_key(name):
+            self.loaded[name] = SavedState(
+                self.saved, "%ssubreq/%s" % (self.prefix, name)
+            )
+        return self.loaded[name]
+
+    def has_key(self, name):
+        return name in self.names
+    __contains__ = has_key
+
+    def keys(self):
+        return list(self.names)
+
+
+class SaveTest(unittest.TestCase):
+    def make_resource(self):
+        from redbot.resource import HttpResource
+        from redbot.resource.active_check.conneg import ConnegCheck
+        resource = HttpResource("http://www.example.com/")
+        response = resource.response
+        response.status_code = "200"
+        response.status_phrase = "OK"
+        response.set_headers([
+            ('Cache-Control', 'max-age=60'),
+            ('Content-Type', 'text/html; charset=utf-8'),
+            ('Bad Name', 'x'),
+        ])
+        response.payload_sample = [(0, "\xff<html>")]
+        response.http_error = httperr.ChunkError("oops")
+        resource.gzip_support = True
+        ConnegCheck(resource, 'conneg')
+        resource.add_note('', rs.VARY_INCONSISTENT, 'conneg',
+                          conneg_vary='a', no_conneg_vary='b')
+        linked = HttpResource("http://www.example.com/a.css")
+        resource.linked.append((linked, 'link'))
+        return resource
+
+    def test_round_trip(self):
+        resource = self.make_resource()
+        fd = StringIO()
+        save(resource, fd)
+        fd.seek(0)
+        saved = SavedTest(fd)
+        self.assertEqual(sorted(saved.index.keys()),
+          ['linked/0', 'main', 'subreq/conneg'])
+        state = saved.resource()
+        self.assertEqual(state.gzip_support, True)
+        self.assertEqual(state.request.uri, resource.request.uri)
+        self.assertEqual(state.response.parsed_headers,
+                         resource.response.parsed_headers)
+        self.assertEqual(state.response.payload_sample, [(0, "\xff<html>")])
+        self.assertEqual(state.response.http_error.desc, "Chunked encoding error")
+        self.assertEqual(list(state.notes), list(resource.notes))
+        self.assertEqual(state.subreqs.loaded, {})
+        self.assertEqual(state.subreqs.get('conneg').request.headers,
+                         resource.subreqs['conneg'].request.headers)
+        self.assertEqual(state.subreqs.get('foo'), None)
+        self.assertEqual(state.linked[0][0].request.uri,
+                         "http://www.example.com/a.css")
+        self.assertEqual(saved.subreq('conneg').name, 'conneg')
+
+    def test_bad(self):
+        self.assertRaises(SaveError, SavedTest, StringIO("foo\n"))
+        self.assertRaises(SaveError, SavedTest,
+                          StringIO("%s %s\n{}\n" % (MAGIC, VERSION + 1)))
@@ -39,7 +39,7 @@ class RedState(object):
 
     def __init__(self, name):
         self.name = name
-        self.notes = []
+        self.notes = rs.Notes()
 
     def __repr__(self):
         status = [self.__class__.__module__ + "." + self.__class__.__name__]
@@ -53,7 +53,4 @@ class RedState(object):
 
     def add_note(self, subject, note, subreq=None, **kw):
         "Set a note."
-        kw['response'] = rs.response.get(
-            self.name, rs.response['this']
-        )['en']
-        self.notes.append(note(subject, subreq, kw))
+        self.notes.add(note, subject, subreq, self.name, tuple(kw.items()))
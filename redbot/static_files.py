@@ -0,0 +1,205 @@
+#!/usr/bin/env python
+
+"""
+Static files for the standalone server.
+
+Everything under the static directory is read in at startup, along with
+its media type, a hash of its content (used for a strong ETag) and, for
+textual types, a gzipped copy, so that serving a file doesn't involve any
+work beyond choosing a representation.
+
+URLs that carry the current content hash as a "v" query argument (see
+html.static_uri) are cached for a year, since they'll change when the
+file does; other URLs are cached briefly, and revalidated with the ETag.
+"""
+
+__author__ = "Mark Nottingham <mnot@mnot.net>"
+__copyright__ = """\
+Copyright (c) 2008-2013 Mark Nottingham
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+"""
+
+import cgi
+import hashlib
+import mimetypes
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+from redbot.render_cache import gzip_bytes, gunzip_bytes, etag_matches, \
+    accepts_gzip
+
+### configuration
+STATIC_MAX_AGE = 60 * 60 # freshness for unversioned URLs, in seconds
+VERSIONED_MAX_AGE = 60 * 60 * 24 * 365 # freshness for content-hashed URLs
+GZIP_MIN_SIZE = 256 # don't bother compressing files smaller than this
+GZIP_TYPES = ['application/javascript', 'application/json',
+              'application/xml', 'image/svg+xml']
+
+
+class StaticFile(object):
+    """
+    A static file's content, media type, content hash and (if it's worth
+    compressing) gzipped content.
+    """
+    __slots__ = ['body', 'gz_body', 'media_type', 'version']
+
+    def __init__(self, body, media_type):
+        self.body = body
+        self.media_type = media_type
+        self.version = hashlib.md5(body).hexdigest()[:16]
+        self.gz_body = None
+        if compressible(media_type) and len(body) >= GZIP_MIN_SIZE:
+            gz_body = gzip_bytes(body)
+            if len(gz_body) < len(body):
+                self.gz_body = gz_body
+
+    def etag(self, gzipped=False):
+        "Return the strong ETag for the identity or gzipped content."
+        if gzipped:
+            return '"%s-gz"' % self.version
+        return '"%s"' % self.version
+
+
+class StaticFiles(object):
+    """
+    The static files under a directory, served under prefix.
+    """
+    def __init__(self, prefix="/static/"):
+        self.prefix = prefix
+        self.files = {} # path (relative to the directory): StaticFile
+
+    def load(self, static_dir):
+        "Read all of the files under static_dir."
+        for dirname, dirnames, names in os.walk(static_dir):
+            for name in names:
+                path = os.path.join(dirname, name)
+                try:
+                    body = open(path, 'rb').read()
+                except IOError:
+                    sys.stderr.write("* Problem loading %s\n" % path)
+                    continue
+                rel_path = os.path.relpath(path, static_dir)
+                self.files[rel_path] = StaticFile(body, media_type(path))
+
+    def versions(self):
+        "Return a dictionary of path: content hash."
+        return dict([(path, static_file.version)
+                     for (path, static_file) in self.files.items()])
+
+    def get(self, path):
+        "Return the StaticFile for a URL path, or None."
+        if not path.startswith(self.prefix):
+            return None
+        return self.files.get(path[len(self.prefix):], None)
+
+    def respond(self, path, query, req_hdrs):
+        """
+        Return (status_code, status_phrase, headers, body) for a request to
+        the URL path and query, given a list of (name, value) request
+        headers; or None if there's no such file.
+        """
+        static_file = self.get(path)
+        if static_file is None:
+            return None
+        req_hdrs = dict([(n.lower(), v) for (n, v) in req_hdrs])
+        gzipped = static_file.gz_body is not None and \
+            accepts_gzip(req_hdrs.get('accept-encoding', None))
+        etag = static_file.etag(gzipped)
+        version = cgi.parse_qs(query).get('v', [None])[-1]
+        if version == static_file.version:
+            cache_control = "public, max-age=%i, immutable" % \
+                VERSIONED_MAX_AGE
+        else:
+            cache_control = "public, max-age=%i" % STATIC_MAX_AGE
+        hdrs = [
+            ("Content-Type", static_file.media_type),
+            ("Cache-Control", cache_control),
+            ("ETag", etag),
+        ]
+        if static_file.gz_body is not None:
+            hdrs.append(("Vary", "Accept-Encoding"))
+        if etag_matches(req_hdrs.get('if-none-match', None), etag):
+            return "304", "Not Modified", hdrs, ""
+        if gzipped:
+            hdrs.append(("Content-Encoding", "gzip"))
+            body = static_file.gz_body
+        else:
+            body = static_file.body
+        hdrs.append(("Content-Length", str(len(body))))
+        return "200", "OK", hdrs, body
+
+
+def media_type(path):
+    "Guess the media type of a file, from its name."
+    mtype, encoding = mimetypes.guess_type(path, strict=False)
+    if mtype is None or encoding is not None:
+        return "application/octet-stream"
+    if mtype == "application/x-javascript":
+        mtype = "application/javascript"
+    if compressible(mtype) and mtype != "image/svg+xml":
+        mtype += "; charset=utf-8"
+    return mtype
+
+
+def compressible(mtype):
+    "Return whether content of media type mtype is worth gzipping."
+    mtype = mtype.split(";", 1)[0].strip().lower()
+    return mtype.startswith("text/") or mtype in GZIP_TYPES
+
+
+class StaticFilesTest(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        os.mkdir(os.path.join(self.dir, "icon"))
+        open(os.path.join(self.dir, "style.css"), 'w').write(
+            "body { color: black; }\n" * 40)
+        open(os.path.join(self.dir, "icon", "a.png"), 'w').write("\x89PNG")
+        self.files = StaticFiles()
+        self.files.load(self.dir)
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def test_respond(self):
+        self.assertEqual(self.files.respond("/static/foo", "", []), None)
+        version = self.files.versions()["style.css"]
+        code, phrase, hdrs, body = self.files.respond(
+            "/static/style.css", "", [("Accept-Encoding", "gzip")])
+        hdrs = dict(hdrs)
+        self.assertEqual(code, "200")
+        self.assertEqual(hdrs["Content-Type"], "text/css; charset=utf-8")
+        self.assertEqual(hdrs["ETag"], '"%s-gz"' % version)
+        self.assertEqual(hdrs["Cache-Control"], "public, max-age=3600")
+        self.assertEqual(gunzip_bytes(body), "body { color: black; }\n" * 40)
+        code, phrase, hdrs, body = self.files.respond(
+            "/static/style.css", "v=%s" % version,
+            [("If-None-Match", '"%s"' % version)])
+        self.assertEqual(code, "304")
+        self.assertTrue("immutable" in dict(hdrs)["Cache-Control"])
+        code, phrase, hdrs, body = self.files.respond(
+            "/static/icon/a.png", "", [("Accept-Encoding", "gzip")])
+        hdrs = dict(hdrs)
+        self.assertEqual(hdrs["Content-Type"], "image/png")
+        self.assertFalse(hdrs.has_key("Content-Encoding"))
+        self.assertFalse(hdrs.has_key("Vary"))
+        self.assertEqual(body, "\x89PNG")
@@ -0,0 +1,504 @@
+#!/usr/bin/env python
+
+"""
+The saved test store.
+
+Saved tests are kept in a directory, sharded into subdirectories by the
+first characters of their test_id, so that no one directory gets too big.
+A test's mtime says when it expires; when it's first written, that's now
+(see Store.new), and saving it pushes it into the future (see Store.keep).
+
+A Sweeper removes tests a while after they expire, working through the
+shards a few at a time so that it can run inside the server's event loop.
+It also keeps the number and size of tests under optional limits, by
+removing the oldest first.
+
+A Writer writes tests on background threads, so that the event loop isn't
+held up.
+
+Run as a script to sweep a store once (e.g., from cron) and show its
+statistics.
+"""
+
+__author__ = "Mark Nottingham <mnot@mnot.net>"
+__copyright__ = """\
+Copyright (c) 2008-2013 Mark Nottingham
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+"""
+
+import base64
+import errno
+import os
+import Queue
+import re
+import shutil
+import tempfile
+import threading
+import unittest
+
+import thor
+
+### configuration
+SHARD_CHARS = 2 # characters of the test_id used to name its shard
+GRACE = 6 * 60 * 60 # seconds to keep a test after it expires
+SWEEP_BATCH = 16 # shards to sweep in each step
+SWEEP_PAUSE = 0.1 # seconds between sweep steps
+SWEEP_INTERVAL = 60 * 60 # seconds between sweeps
+HIST_BUCKET = 60 * 60 # granularity of oldest-first eviction, in seconds
+WRITE_QUEUE = 32 # tests that can be waiting to be written
+WRITE_THREADS = 1 # threads writing tests
+WRITE_WAIT = 5 * 60 # seconds a test may take to be written once created
+
+TEST_ID = re.compile(r"^[A-Za-z0-9_-]+$")
+
+
+class Store(object):
+    """
+    A directory of saved tests, rooted at root.
+    """
+    def __init__(self, root):
+        self.root = root
+
+    def path(self, test_id):
+        """
+        Return the path to test_id. Tests stored before the directory was
+        sharded are found at the top level.
+
+        Raises IOError if test_id isn't a valid test_id.
+        """
+        if not test_id or not TEST_ID.match(test_id):
+            raise IOError, "Bad test_id: %r" % test_id
+        path = os.path.join(self.root, test_id[:SHARD_CHARS], test_id)
+        if not os.path.exists(path):
+            flat_path = os.path.join(self.root, test_id)
+            if os.path.exists(flat_path):
+                return flat_path
+        return path
+
+    def new(self):
+        """
+        Create a new, empty test, expiring now. Returns (fd, test_id),
+        where fd is an OS-level file descriptor open for writing.
+        """
+        while True:
+            test_id = base64.urlsafe_b64encode(os.urandom(9))
+            shard = os.path.join(self.root, test_id[:SHARD_CHARS])
+            try:
+                os.mkdir(shard)
+            except OSError, why:
+                if why.errno != errno.EEXIST:
+                    raise
+            try:
+                fd = os.open(os.path.join(shard, test_id),
+                             os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0600)
+            except OSError, why:
+                if why.errno == errno.EEXIST:
+                    continue
+                raise
+            return fd, test_id
+
+    def open(self, test_id):
+        "Open test_id for reading."
+        return open(self.path(test_id), 'rb')
+
+    def pending(self, fd, within=WRITE_WAIT):
+        """
+        Return whether the test open on fd (see open) is still waiting to
+        be written; i.e., it's empty, and was created or saved less than
+        within seconds ago.
+        """
+        stat = os.fstat(fd.fileno())
+        return stat.st_size == 0 and thor.time() - stat.st_ctime < within
+
+    def keep(self, test_id, lifetime):
+        "Make test_id expire lifetime seconds from now."
+        now = thor.time()
+        os.utime(self.path(test_id), (now, now + lifetime))
+
+
+class Writer(object):
+    """
+    Write tests to store on background threads.
+
+    At most queue_size tests can be waiting to be written; when that many
+    are, busy() is true, and further tests are dropped. stats counts the
+    tests written, dropped and that failed to write.
+
+    Threads are started when the first test is submitted in each process,
+    so that a Writer can be used on both sides of a fork; tests queued
+    before the fork are left to the parent.
+    """
+    def __init__(self, store, queue_size=WRITE_QUEUE, threads=WRITE_THREADS):
+        self.store = store
+        self.queue_size = queue_size
+        self.threads = threads
+        self.stats = {'written': 0, 'dropped': 0, 'failed': 0}
+        self._queue = Queue.Queue(queue_size)
+        self._pid = None # of the process the threads are running in
+        self._lock = threading.Lock()
+
+    def busy(self):
+        "Return whether there's no room to queue another test."
+        return self._queue.full()
+
+    def submit(self, test_id, write, *args):
+        """
+        Queue test_id to be written, by calling write with args, followed
+        by a file object to write to. Returns False if it was dropped.
+        """
+        if self._pid != os.getpid():
+            self._start()
+        try:
+            self._queue.put_nowait((test_id, write, args))
+        except Queue.Full:
+            self._count('dropped')
+            return False
+        return True
+
+    def join(self):
+        "Wait until all queued tests are written."
+        self._queue.join()
+
+    def close(self):
+        "Write all queued tests, and stop the threads."
+        if self._pid != os.getpid():
+            return
+        for thread in self._threads:
+            self._queue.put(None)
+        for thread in self._threads:
+            thread.join()
+        self._pid = None
+
+    def _start(self):
+        if self._pid is not None: # forked
+            self._queue = Queue.Queue(self.queue_size)
+            self._lock = threading.Lock()
+        self._pid = os.getpid()
+        self._threads = []
+        for i in range(self.threads):
+            thread = threading.Thread(target=self._run)
+            thread.daemon = True
+            thread.start()
+            self._threads.append(thread)
+
+    def _count(self, name):
+        with self._lock:
+            self.stats[name] += 1
+
+    def _run(self):
+        while True:
+            job = self._queue.get()
+            if job is None:
+                self._queue.task_done()
+                return
+            test_id, write, args = job
+            try:
+                self._write(test_id, write, args)
+                self._count('written')
+            except Exception:
+                self._count('failed')
+            self._queue.task_done()
+
+    def _write(self, test_id, write, args):
+        """
+        Write the test to a temporary file and move it into place, keeping
+        the expiry of the original if it's been saved in the meantime.
+
+        The original is held open, so that if it's saved (see Store.keep)
+        after its expiry is copied but before it's replaced, that can be
+        seen and copied again.
+        """
+        path = self.store.path(test_id)
+        tmp_path = "%s.tmp" % path
+        orig = open(path, 'rb')
+        try:
+            fd = open(tmp_path, 'wb')
+            try:
+                try:
+                    write(*(args + (fd,)))
+                finally:
+                    fd.close()
+                mtime = os.fstat(orig.fileno()).st_mtime
+                if mtime > thor.time():
+                    os.utime(tmp_path, (thor.time(), mtime))
+                os.rename(tmp_path, path)
+            except:
+                try:
+                    os.remove(tmp_path)
+                except OSError:
+                    pass
+                raise
+            kept = os.fstat(orig.fileno()).st_mtime
+            if kept > mtime and kept > os.stat(path).st_mtime:
+                os.utime(path, (thor.time(), kept))
+        finally:
+            orig.close()
+
+
+class Sweeper(object):
+    """
+    Remove tests from store that expired more than GRACE seconds ago. If
+    max_files or max_bytes is set, also remove the oldest tests to keep
+    the store within those limits.
+
+    Each pass over the store is made a batch of shards at a time; after it,
+    stats has the number of tests and bytes found and removed. Tests aren't
+    evicted for being over a limit until the pass after the one that found
+    the store was too big.
+
+    Other files kept with tests (e.g., rendered pages; see
+    redbot.render_cache) are removed along with them, but don't count
+    towards the limits.
+    """
+    def __init__(self, store, max_files=None, max_bytes=None,
+                 batch=SWEEP_BATCH):
+        self.store = store
+        self.max_files = max_files
+        self.max_bytes = max_bytes
+        self.batch = batch
+        self.stats = {}
+        self._pending = None # shards left in this pass
+        self._cutoff = None # remove tests with an mtime older than this
+        self._evict_before = None # ... or this, to keep under the limits
+        self._histogram = {} # bucket: [files, bytes]
+        self._pass = None
+        self._event = None
+
+    def start(self, interval=SWEEP_INTERVAL):
+        "Sweep every interval seconds on the thor event loop."
+        def step():
+            if self.step():
+                self._event = thor.schedule(interval, step)
+            else:
+                self._event = thor.schedule(SWEEP_PAUSE, step)
+        self._event = thor.schedule(0, step)
+
+    def stop(self):
+        "Stop sweeping on the event loop."
+        if self._event:
+            self._event.delete()
+            self._event = None
+
+    def sweep(self):
+        "Make a complete pass over the store, returning stats."
+        while not self.step():
+            pass
+        return self.stats
+
+    def step(self):
+        "Sweep the next batch of shards; return True at the end of a pass."
+        if self._pending is None:
+            self._start_pass()
+        for i in range(min(self.batch, len(self._pending))):
+            self._sweep_dir(self._pending.pop())
+        if self._pending:
+            return False
+        self._end_pass()
+        return True
+
+    def _start_pass(self):
+        self._cutoff = thor.time() - GRACE
+        self._histogram = {}
+        self._pass = {'files': 0, 'bytes': 0, 'expired': 0, 'evicted': 0}
+        try:
+            names = os.listdir(self.store.root)
+        except OSError:
+            names = []
+        self._pending = [os.path.join(self.store.root, name)
+                         for name in names if len(name) == SHARD_CHARS]
+        self._pending.append(self.store.root) # unsharded tests
+
+    def _sweep_dir(self, dir_path):
+        try:
+            names = os.listdir(dir_path)
+        except OSError:
+            return
+        for name in names:
+            if dir_path == self.store.root and len(name) == SHARD_CHARS:
+                continue # a shard
+            path = os.path.join(dir_path, name)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            if stat.st_mtime < self._cutoff:
+                reason = 'expired'
+            elif self._evict_before and stat.st_mtime < self._evict_before:
+                reason = 'evicted'
+            elif not TEST_ID.match(name):
+                continue # not a test
+            else:
+                self._pass['files'] += 1
+                self._pass['bytes'] += stat.st_size
+                bucket = self._histogram.setdefault(
+                    int(stat.st_mtime // HIST_BUCKET), [0, 0])
+                bucket[0] += 1
+                bucket[1] += stat.st_size
+                continue
+            try:
+                os.remove(path)
+                self._pass[reason] += 1
+            except OSError:
+                pass
+
+    def _end_pass(self):
+        self.stats = self._pass
+        self._pending = None
+        self._evict_before = None
+        files, size = self.stats['files'], self.stats['bytes']
+        for bucket in sorted(self._histogram.keys()):
+            if (self.max_files is None or files <= self.max_files) and \
+              (self.max_bytes is None or size <= self.max_bytes):
+                break
+            files -= self._histogram[bucket][0]
+            size -= self._histogram[bucket][1]
+            self._evict_before = (bucket + 1) * HIST_BUCKET
+
+
+class StoreTest(unittest.TestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.store = Store(self.root)
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+
+    def add(self, expires, size=1):
+        fd, test_id = self.store.new()
+        os.write(fd, "x" * size)
+        os.close(fd)
+        self.store.keep(test_id, expires - thor.time())
+        return test_id
+
+    def test_store(self):
+        fd, test_id = self.store.new()
+        os.write(fd, "foo")
+        os.close(fd)
+        self.assertEqual(os.path.dirname(self.store.path(test_id)),
+                         os.path.join(self.root, test_id[:SHARD_CHARS]))
+        self.assertEqual(self.store.open(test_id).read(), "foo")
+        open(os.path.join(self.root, "abcdef"), 'w').close()
+        self.assertEqual(self.store.path("abcdef"),
+                         os.path.join(self.root, "abcdef"))
+        self.assertRaises(IOError, self.store.open, "../foo")
+
+    def test_writer(self):
+        def write(content, fd):
+            fd.write(content)
+        fd, test_id = self.store.new()
+        os.close(fd)
+        writer = Writer(self.store, queue_size=2)
+        writer.submit(test_id, write, "foo")
+        writer.submit("../bad", write, "bar")
+        writer.close()
+        self.assertEqual(self.store.open(test_id).read(), "foo")
+        self.assertEqual((writer.stats['written'], writer.stats['failed']),
+                         (1, 1))
+
+    def test_pending(self):
+        fd, test_id = self.store.new()
+        os.close(fd)
+        self.assertTrue(self.store.pending(self.store.open(test_id)))
+        self.assertFalse(self.store.pending(self.store.open(test_id), 0))
+        self.store.keep(test_id, 3600)
+        self.assertTrue(self.store.pending(self.store.open(test_id)))
+        open(self.store.path(test_id), 'wb').write("foo")
+        self.assertFalse(self.store.pending(self.store.open(test_id)))
+
+    def test_writer_busy(self):
+        started = threading.Event()
+        release = threading.Event()
+        def write(content, fd):
+            started.set()
+            release.wait()
+            fd.write(content)
+        test_ids = []
+        for i in range(3):
+            fd, test_id = self.store.new()
+            os.close(fd)
+            test_ids.append(test_id)
+        writer = Writer(self.store, queue_size=1, threads=1)
+        self.assertTrue(writer.submit(test_ids[0], write, "foo"))
+        started.wait()
+        self.store.keep(test_ids[0], 3600)
+        self.assertFalse(writer.busy())
+        self.assertTrue(writer.submit(test_ids[1], write, "bar"))
+        self.assertTrue(writer.busy())
+        self.assertFalse(writer.submit(test_ids[2], write, "baz"))
+        self.assertEqual(writer.stats['dropped'], 1)
+        release.set()
+        writer.close()
+        self.assertEqual(writer.stats['written'], 2)
+        self.assertTrue(
+            os.stat(self.store.path(test_ids[0])).st_mtime > thor.time())
+
+    def test_sweep(self):
+        now = thor.time()
+        old = self.add(now - GRACE - 10)
+        new = self.add(now)
+        stats = Sweeper(self.store, batch=1).sweep()
+        self.assertEqual(stats['expired'], 1)
+        self.assertEqual(stats['files'], 1)
+        self.assertFalse(os.path.exists(self.store.path(old)))
+        self.assertTrue(os.path.exists(self.store.path(new)))
+
+    def test_evict(self):
+        now = thor.time()
+        older = self.add(now - HIST_BUCKET * 2, 10)
+        newer = self.add(now, 10)
+        sweeper = Sweeper(self.store, max_bytes=15)
+        render = self.store.path(newer) + ".abc.gz"
+        open(render, 'w').write("x" * 100)
+        self.assertEqual(sweeper.sweep()['bytes'], 20)
+        stats = sweeper.sweep()
+        self.assertEqual((stats['evicted'], stats['bytes']), (1, 10))
+        self.assertFalse(os.path.exists(self.store.path(older)))
+        self.assertTrue(os.path.exists(self.store.path(newer)))
+
+
+def main():
+    from optparse import OptionParser
+    usage = "Usage: %prog [options] save_dir"
+    opt_parser = OptionParser(usage=usage)
+    opt_parser.add_option(
+        "-f", "--max-files",
+        action="store", type="int", dest="max_files",
+        help="most tests to keep"
+    )
+    opt_parser.add_option(
+        "-b", "--max-bytes",
+        action="store", type="int", dest="max_bytes",
+        help="most bytes of tests to keep"
+    )
+    (options, args) = opt_parser.parse_args()
+    if len(args) != 1:
+        opt_parser.error("Please specify a save_dir.")
+    sweeper = Sweeper(Store(args[0]), options.max_files, options.max_bytes)
+    stats = sweeper.sweep()
+    if sweeper._evict_before: # over a limit; evict now
+        expired = stats['expired']
+        stats = sweeper.sweep()
+        stats['expired'] += expired
+    for name in ['files', 'bytes', 'expired', 'evicted']:
+        print "%s: %s" % (name, stats[name])
+
+
+if __name__ == "__main__":
+    main()
@@ -16,7 +16,7 @@ setup(name='redbot',
                 'redbot.resource.active_check'
       ],
       package_dir={'redbot': 'redbot'},
-      scripts=['bin/redbot'],
+      scripts=['bin/redbot', 'bin/redbot-lint'],
       install_requires = ['thor >= 0.1'],
       classifiers=[
         'Programming Language :: Python'
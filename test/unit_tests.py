@@ -1,6 +1,7 @@
 #!/usr/bin/env python
 # coding=UTF-8
 
+import itertools
 import sys
 import unittest
 sys.path.insert(0, "..")
@@ -58,6 +59,40 @@ class GeneralHeaderTesters(unittest.TestCase):
                 "[%s] %s != %s" % (i, str(expected_outlist), str(outlist)))
             i += 1
     
+    def test_split_list(self):
+        i = 0
+        for (instr, expected_outlist) in [
+            ('foo', ['foo']),
+            ('', ['']),
+            ('foo, bar,baz', ['foo', 'bar', 'baz']),
+            ('foo,, ,bar,', ['foo', '', 'bar']),
+            ('foo, ', ['foo', '']),
+            ('a="b,c", d', ['a="b,c"', 'd']),
+            (r'a="b\",c", d', [r'a="b\",c"', 'd']),
+            ('a="b, c', ['b', 'c']),
+            ('"a; b="c"', ['a; b="c"']),
+            ('"a, "b', ['"a, "b']),
+        ]:
+            outlist = headers.split_list(unicode(instr))
+            self.assertEqual(expected_outlist, outlist,
+                "[%s] %s != %s" % (i, str(expected_outlist), str(outlist)))
+            i += 1
+
+    def test_parse_time_limit(self):
+        # a clock that advances a second each time it's read
+        clock = headers.clock
+        headers.clock = itertools.count().next
+        try:
+            self.red.headers = [
+                ('Cache-Control', 'a, b'), ('Cache-Control', 'c')
+            ]
+            headers.process_headers(self.red)
+        finally:
+            headers.clock = clock
+        self.assertEqual(self.red.note_classes, ['HEADER_TOO_COMPLEX'])
+        self.assertEqual(self.red.parsed_headers['cache-control'],
+                         set([('a', None)]))
+
     def test_parse_params(self):
         i = 0
         for (instr, expected_pd, expected_notes, delim) in [